@@ -0,0 +1,189 @@
+import numpy as np
+import math
+from result_store import log_checkpoints
+
+class LockstepKLL:
+    def __init__(self, num_series, k=200, c=2 / 3, rng=None):
+        """
+        KLL quantile sketches for num_series value streams that always grow together.
+
+        Every update adds one value to each series, so all sketches have identical
+        shapes and compact at the same moments; each level is one 2-D array of shape
+        (num_series, items) and compactions are vectorized across series.
+
+        :param num_series: Number of independent streams (e.g. checkpoints).
+        :param k: Accuracy parameter; rank error is roughly 1.7 / k.
+        :param c: Capacity decay between levels.
+        """
+        self.num_series = num_series
+        self.k = k
+        self.c = c
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.levels = [np.empty((num_series, 0))]
+        self.n = 0
+
+    def capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def update(self, values):
+        """Add one value per series."""
+        self.levels[0] = np.hstack([self.levels[0], np.asarray(values, dtype=float)[:, None]])
+        self.n += 1
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.shape[1] >= self.capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty((self.num_series, 0)))
+                level = np.sort(level, axis=1)
+                # An odd item stays behind; the rest are halved from a random offset
+                keep = level[:, :level.shape[1] % 2]
+                pairs = level[:, level.shape[1] % 2:]
+                offset = self.rng.integers(2)
+                self.levels[h + 1] = np.hstack([self.levels[h + 1], pairs[:, offset::2]])
+                self.levels[h] = keep
+            h += 1
+
+    def merge(self, other):
+        """Fold another sketch over the same series into this one."""
+        assert other.num_series == self.num_series, "Sketches cover different series."
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty((self.num_series, 0)))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.hstack([self.levels[h], level])
+        self.n += other.n
+        self._compress()
+
+    def quantiles(self, qs):
+        """Array of shape (len(qs), num_series) with the estimated quantiles."""
+        items = np.hstack(self.levels)
+        weights = np.hstack([np.full(level.shape[1], 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, axis=1)
+        sorted_items = np.take_along_axis(items, order, axis=1)
+        cum = np.cumsum(weights[order], axis=1)
+        total = cum[:, -1:]
+        out = np.empty((len(qs), self.num_series))
+        for i, q in enumerate(qs):
+            idx = (cum < q * total).sum(axis=1)
+            out[i] = sorted_items[np.arange(self.num_series), np.minimum(idx, items.shape[1] - 1)]
+        return out
+
+class RegretAggregator:
+    def __init__(self, total_rounds, num_points=200, k=200, quantiles=(0.05, 0.5, 0.95), rng=None):
+        """
+        Streaming mean, variance and quantiles of cumulative regret across runs.
+
+        Only the regret at log-spaced checkpoints is kept: Welford running mean and
+        M2 per checkpoint plus a KLL sketch per checkpoint, so memory does not grow
+        with the number of runs. Aggregators built in different processes can be
+        combined with merge().
+
+        :param total_rounds: Length of every run.
+        :param num_points: Number of log-spaced checkpoints.
+        :param k: KLL accuracy parameter.
+        :param quantiles: Quantiles reported by summary().
+        """
+        self.total_rounds = total_rounds
+        self.checkpoints = log_checkpoints(total_rounds, num_points)
+        self.quantile_levels = tuple(quantiles)
+        P = len(self.checkpoints)
+        self.count = 0
+        self.mean = np.zeros(P)
+        self.m2 = np.zeros(P)
+        self.sketch = LockstepKLL(P, k, rng=rng)
+
+    def add_run(self, regret):
+        """Add one full cumulative-regret curve."""
+        regret = np.asarray(regret)
+        assert len(regret) >= self.total_rounds, "Run is shorter than total_rounds."
+        self._add(regret[self.checkpoints])
+
+    def _add(self, values):
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+        self.sketch.update(values)
+
+    def run(self):
+        """Feeder for one run that arrives in chunks: feeder.extend(chunk) ... feeder.close()."""
+        return _RunFeeder(self)
+
+    def merge(self, other):
+        """Combine with an aggregator of the same configuration (Chan et al. parallel update)."""
+        assert np.array_equal(self.checkpoints, other.checkpoints), "Aggregators use different checkpoints."
+        if other.count == 0:
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.mean += delta * other.count / n
+        self.count = n
+        self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self):
+        """Dict with checkpoints (1-based rounds), mean, std, standard error and the quantiles."""
+        var = self.m2 / (self.count - 1) if self.count > 1 else np.zeros_like(self.m2)
+        std = np.sqrt(var)
+        result = {
+            "rounds": self.checkpoints + 1,
+            "runs": self.count,
+            "mean": self.mean.copy(),
+            "std": std,
+            "stderr": std / math.sqrt(max(self.count, 1)),
+        }
+        for q, values in zip(self.quantile_levels, self.sketch.quantiles(self.quantile_levels)):
+            result[f"q{q:g}"] = values
+        return result
+
+class _RunFeeder:
+    def __init__(self, aggregator):
+        self.aggregator = aggregator
+        self.values = np.full(len(aggregator.checkpoints), np.nan)
+        self.offset = 0
+
+    def extend(self, chunk):
+        """Consume the next chunk of the run's cumulative regret."""
+        chunk = np.asarray(chunk)
+        checkpoints = self.aggregator.checkpoints
+        lo = np.searchsorted(checkpoints, self.offset)
+        hi = np.searchsorted(checkpoints, self.offset + len(chunk))
+        self.values[lo:hi] = chunk[checkpoints[lo:hi] - self.offset]
+        self.offset += len(chunk)
+
+    def close(self):
+        assert not np.isnan(self.values).any(), "Run ended before the last checkpoint."
+        self.aggregator._add(self.values)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+
+if __name__ == "__main__":
+    from lockstep import LockstepCascadeUCB
+    T = 5000
+    workers = []
+    # Two "workers" aggregating their own runs, then merged
+    for worker in range(2):
+        aggregator = RegretAggregator(T, num_points=50)
+        rng = np.random.default_rng(worker)
+        engine = LockstepCascadeUCB(rng.uniform(0, 1, (500, 10)), 3, rng)
+        curves = np.cumsum([engine.step()[2] for _ in range(T)], axis=0)
+        for run in curves.T:
+            with aggregator.run() as feed:
+                for start in range(0, T, 1000):
+                    feed.extend(run[start:start + 1000])
+        workers.append(aggregator)
+    total = workers[0].merge(workers[1])
+    summary = total.summary()
+    print(f"{summary['runs']} runs, final regret mean {summary['mean'][-1]:.2f} "
+          f"+- {summary['stderr'][-1]:.2f}, median {summary['q0.5'][-1]:.2f}, 90% band "
+          f"[{summary['q0.05'][-1]:.2f}, {summary['q0.95'][-1]:.2f}]")
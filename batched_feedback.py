@@ -0,0 +1,56 @@
+import numpy as np
+import time
+from cascade_common import CascadeUCB, optimize
+
+def simulate_batched_ucb(total_rounds, click_probabilities, num_positions, batch_size, rng=None):
+    """
+    Cascade UCB where feedback arrives in batches of batch_size rounds.
+
+    The index is only refreshed between batches, so every user of a batch sees the
+    same ranking; clicks of the whole batch are drawn and applied with one
+    update_batch call.
+
+    :return: (cumulative regret at the end of each batch, rounds per second)
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    probabilities = np.asarray(click_probabilities)
+    learner = CascadeUCB(len(probabilities), num_positions)
+    optimal_score = optimize(list(probabilities), num_positions)
+    current_regret = 0.0
+    regret = []
+
+    start = time.perf_counter()
+    for first in range(0, total_rounds, batch_size):
+        n = min(batch_size, total_rounds - first)
+        selected_arms = learner.select()
+        p = probabilities[selected_arms]
+        hits = rng.random((n, num_positions)) < p
+        clicks = np.where(hits.any(axis=1), hits.argmax(axis=1), num_positions)
+        learner.update_batch(np.broadcast_to(selected_arms, (n, num_positions)), clicks)
+
+        current_regret += n * (optimal_score - (1 - np.prod(1 - p)))
+        regret.append(current_regret)
+    elapsed = time.perf_counter() - start
+
+    return regret, total_rounds / elapsed
+
+def batching_experiment(total_rounds=200000, num_arms=50, num_positions=4, batch_sizes=(1, 10, 100, 1000, 10000, 100000), seeds=3):
+    """
+    Regret cost and throughput gain of batched feedback on shared random instances.
+
+    :return: Dict of batch size -> mean final regret and mean rounds per second over the seeds.
+    """
+    results = {}
+    instances = [np.random.default_rng(seed).uniform(0, 1, num_arms) for seed in range(seeds)]
+    for batch_size in batch_sizes:
+        final, speed = [], []
+        for seed, probabilities in enumerate(instances):
+            regret, rounds_per_second = simulate_batched_ucb(total_rounds, probabilities, num_positions, batch_size, np.random.default_rng(1000 + seed))
+            final.append(regret[-1])
+            speed.append(rounds_per_second)
+        results[batch_size] = {"final_regret": float(np.mean(final)), "rounds_per_second": float(np.mean(speed))}
+    return results
+
+if __name__ == "__main__":
+    for batch_size, row in batching_experiment().items():
+        print(f"batch {batch_size:>6}: final regret {row['final_regret']:10.2f}, {row['rounds_per_second']:14,.0f} rounds/s")
@@ -0,0 +1,165 @@
+import numpy as np
+import random
+import math
+
+class CascadingBandit:
+    def __init__(self, num_arms, probabilities, num_positions):
+        """
+        Initialize the cascading bandit environment.
+
+        :param num_arms: Total number of arms (items) available.
+        :param probabilities: List of click probabilities for each arm.
+        :param num_positions: Number of positions to recommend.
+        """
+        assert len(probabilities) == num_arms, "Probabilities must match the number of arms."
+        assert num_positions <= num_arms, "Number of positions cannot exceed number of arms."
+
+        self.num_arms = num_arms
+        self.probabilities = probabilities
+        self.num_positions = num_positions
+        self.reset()
+
+    def reset(self):
+        """Reset the environment (e.g., for a new simulation run)."""
+        self.history = []  # Stores history of arm selections and clicks
+
+    def recommend(self, selected_arms):
+        """
+        Simulate a recommendation to the user.
+
+        :param selected_arms: List of indices of arms to recommend (length should match num_positions).
+        :return: Index of the clicked position, or num_positions if nothing was clicked.
+        """
+        assert len(selected_arms) == self.num_positions, "Number of selected arms must match num_positions."
+
+        for i, arm in enumerate(selected_arms):
+            if np.random.rand() < self.probabilities[arm]:  # Simulate click
+                click = i
+                break  # Stop after the first click (cascading model)
+        else:
+            click = self.num_positions
+
+        self.history.append((selected_arms, click))
+        return click
+
+# Learner state dtypes: (float dtype for means and indices, dtype for click/examination counters)
+PRECISIONS = {
+    "float64": (np.float64, np.float64),
+    "float32": (np.float32, np.uint32),
+}
+
+def compute_ucb(empirical_means, counts, t, dtype=np.float64, exploration=1.5):
+    """
+    UCB index for every arm, same formula as problem_a.py but without the Python loop.
+
+    :param empirical_means: Array of empirical click rates.
+    :param counts: Array of examination counts.
+    :param t: Current round (1-based).
+    :param dtype: Float dtype the index is computed in.
+    :param exploration: Constant in front of the log term (1.5 in all the scripts).
+    :return: Array of UCB values, np.inf for arms that were never examined.
+    """
+    counts = np.asarray(counts)
+    with np.errstate(divide="ignore"):
+        bonus = np.sqrt(dtype(exploration * math.log(t + 1)) / counts.astype(dtype, copy=False))
+    return np.where(counts == 0, dtype(np.inf), empirical_means + bonus)
+
+def optimize(click_probabilities, num_positions):
+    """Score of the best num_positions arms. Unlike the scripts, this does not sort the input in place."""
+    best = sorted(click_probabilities, reverse = True)[:num_positions]
+    return calc_score(list(range(num_positions)), best, num_positions)
+
+def calc_score(positions, click_probabilities, num_positions):
+    prob = 1
+    for arm in positions:
+        arm = int(arm)
+        prob = prob * (1 - click_probabilities[arm])
+    prob = 1 - prob
+    return  prob
+
+def convert_to_int(arm, M, L):
+    result = 0
+    for index, a in enumerate(arm):
+        result += a * (L ** (M - index - 1))
+    return result
+
+def convert_to_arm(num, M, L):
+    result = []
+    while(len(result) < M):
+        result.insert(0, num % L)
+        num = num // L
+    return result
+
+def random_probabilities(num_arms):
+    """Draw a random instance the same way the simulation scripts do."""
+    return [random.uniform(0, 1) for _ in range(num_arms)]
+
+class CascadeUCB:
+    def __init__(self, num_arms, num_positions, precision="float64", exploration=1.5):
+        """
+        The problem_a.py UCB learner as an object with select()/update().
+
+        :param num_arms: Total number of arms (items) available.
+        :param num_positions: Number of positions to recommend.
+        :param precision: "float64" keeps the running means of problem_a.py;
+                          "float32" keeps uint32 click/examination counters and
+                          computes means and UCB in float32.
+        :param exploration: Constant in front of the log term of the UCB bonus.
+        """
+        assert precision in PRECISIONS, f"precision must be one of {list(PRECISIONS)}."
+        self.num_arms = num_arms
+        self.num_positions = num_positions
+        self.precision = precision
+        self.exploration = exploration
+        self.float_dtype, count_dtype = PRECISIONS[precision]
+        self.empirical_means = np.zeros(num_arms, dtype=self.float_dtype)
+        self.clicks = np.zeros(num_arms, dtype=count_dtype)
+        self.counts = np.zeros(num_arms, dtype=count_dtype)
+        self.t = 1
+        self.ucb_values = None  # cached index, recomputed on the first select() after an update
+
+    def ucb(self):
+        if self.ucb_values is None:
+            if self.precision != "float64":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    self.empirical_means = self.clicks.astype(self.float_dtype) / self.counts
+            self.ucb_values = compute_ucb(self.empirical_means, self.counts, self.t, self.float_dtype, self.exploration)
+        return self.ucb_values
+
+    def select(self):
+        return np.argsort(self.ucb())[-self.num_positions:][::-1]
+
+    def update(self, selected_arms, click):
+        for i, arm in enumerate(selected_arms[:click + 1]):
+            reward = 1 if i == click else 0
+            self.counts[arm] += 1
+            self.clicks[arm] += reward
+            if self.precision == "float64":
+                self.empirical_means[arm] = ((self.empirical_means[arm] * (self.counts[arm] - 1)) + reward) / self.counts[arm]
+        self.t += 1
+        self.ucb_values = None
+
+    def update_batch(self, rankings, clicks):
+        """
+        Apply many rounds of cascade feedback at once.
+
+        Examinations and clicks are counted per arm with np.bincount, and the UCB
+        index is refreshed once for the whole batch instead of once per event.
+
+        :param rankings: Int array of shape (num_rounds, num_positions).
+        :param clicks: Clicked position of each round, num_positions for no click.
+        """
+        rankings = np.asarray(rankings)
+        clicks = np.asarray(clicks)
+        positions = np.arange(rankings.shape[1])
+        examined = np.bincount(rankings[positions <= clicks[:, None]], minlength=self.num_arms)
+        clicked = np.bincount(rankings[positions == clicks[:, None]], minlength=self.num_arms)
+
+        if self.precision == "float64":
+            seen = examined > 0
+            old_counts = self.counts[seen]
+            self.empirical_means[seen] = (self.empirical_means[seen] * old_counts + clicked[seen]) / (old_counts + examined[seen])
+        self.counts += examined.astype(self.counts.dtype)
+        self.clicks += clicked.astype(self.clicks.dtype)
+        self.t += len(clicks)
+        self.ucb_values = None
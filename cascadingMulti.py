@@ -2,6 +2,10 @@ import numpy as np
 import random
 import math
 from matplotlib import pyplot as plt
+from profiling import PhaseTimer
+
+# Call counters for the helpers below, printed at the end of the run
+timer = PhaseTimer()
 
 class CascadingBandit:
     def __init__(self, total_arms, num_arms, num_players, probabilities, num_positions):
@@ -51,10 +55,8 @@ class CascadingBandit:
         return click
 
 def optimize(click_probabilities, num_positions):
+    timer.count("optimize")
     click_probabilities.sort(reverse = True)
-    print("OPTIMIZE")
-    print("click_probabilities", str(len(click_probabilities)))
-    print("num_positions", str(num_positions))
     # top_positions = click_probabilities[:num_positions]
     # for arm in range(num_positions, len(click_probabilities)):
     #     for i, top_arm in enumerate(top_positions):
@@ -65,13 +67,9 @@ def optimize(click_probabilities, num_positions):
     return calc_score(list(range(num_positions)), click_probabilities, num_positions)
 
 def calc_score(positions, click_probabilities, num_positions):
-    print("CALC_SCORE")
-    print("positions", str(len(positions)))
-    print("click_probabilities", str(len(click_probabilities)))
-    print("num_positions", str(num_positions))
+    timer.count("calc_score")
     prob = 1
     for arm in positions:
-        print(arm)
         arm = int(arm)
         prob = prob * (1 - click_probabilities[arm])
     prob = 1 - prob
@@ -209,6 +207,7 @@ def simulate_cascading_bandit(total_rounds):
 
 T = 100
 regret = simulate_cascading_bandit(T)
+print(timer.summary())
 # plt.scatter(list(range(T)), regret)
 # plt.show()
 # print("Final Regret: ", *regret)
\ No newline at end of file
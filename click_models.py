@@ -0,0 +1,145 @@
+import numpy as np
+import time
+from abc import ABC, abstractmethod
+
+class BatchedClickModel(ABC):
+    def __init__(self, probabilities, num_positions, rng=None, tape=None):
+        """
+        Abstract base class for vectorized click environments.
+
+        Every model takes a batch of rankings of shape (num_users, num_positions) and
+        returns a click matrix of the same shape. Models built with the same rng share
+        one random stream.
+
+        :param probabilities: List of attraction (click) probabilities for each arm.
+        :param num_positions: Number of positions to recommend.
+        :param rng: np.random.Generator to draw from (a fresh one if None).
+        :param tape: Optional tapes.ClickTape; attraction uniforms are then read from it,
+                     one row per user, indexed by arm.
+        """
+        assert num_positions <= len(probabilities), "Number of positions cannot exceed number of arms."
+
+        self.num_arms = len(probabilities)
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        self.num_positions = num_positions
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.tape_cursor = tape.cursor() if tape is not None else None
+        self.reset()
+
+    def reset(self):
+        """Reset the environment (e.g., for a new simulation run)."""
+        self.history = []  # Stores history of arm selections and clicks
+
+    def attraction_uniforms(self, rankings):
+        """Uniforms compared with the attraction probabilities of the ranked arms."""
+        if self.tape_cursor is None:
+            return self.rng.random(rankings.shape)
+        rows = self.tape_cursor.rows(len(rankings))
+        return rows[np.arange(len(rankings))[:, None], rankings]
+
+    @abstractmethod
+    def clicks(self, rankings):
+        """
+        Simulate a batch of users.
+
+        :param rankings: Int array of shape (num_users, num_positions).
+        :return: uint8 click matrix of shape (num_users, num_positions).
+        """
+
+    def recommend_batch(self, rankings):
+        rankings = np.asarray(rankings)
+        assert rankings.shape[1] == self.num_positions, "Number of selected arms must match num_positions."
+        return self.clicks(rankings)
+
+    def recommend(self, selected_arms):
+        """
+        Single-user interface matching CascadingBandit.recommend.
+
+        :return: Index of the first clicked position, or num_positions if nothing was clicked.
+        """
+        click = int(first_click(self.recommend_batch([selected_arms]))[0])
+        self.history.append((selected_arms, click))
+        return click
+
+class CascadeModel(BatchedClickModel):
+    """Pure cascade model: the user scans down and stops at the first click."""
+
+    def clicks(self, rankings):
+        attracted = self.attraction_uniforms(rankings) < self.probabilities[rankings]
+        return only_first(attracted)
+
+class PositionBasedModel(BatchedClickModel):
+    def __init__(self, probabilities, num_positions, examination, rng=None, tape=None):
+        """
+        Position-based model: position i is examined with probability examination[i],
+        independently of the other positions, so a user can click several items.
+
+        :param examination: List of examination probabilities, one per position.
+        """
+        assert len(examination) == num_positions, "Need one examination probability per position."
+        super().__init__(probabilities, num_positions, rng, tape)
+        self.examination = np.asarray(examination, dtype=float)
+
+    def clicks(self, rankings):
+        click_prob = self.probabilities[rankings] * self.examination
+        return (self.attraction_uniforms(rankings) < click_prob).astype(np.uint8)
+
+class DependentClickModel(BatchedClickModel):
+    def __init__(self, probabilities, num_positions, termination, rng=None, tape=None):
+        """
+        Dependent click model (DCM): the user scans down, clicks attractive items and
+        after a click at position i stops with probability termination[i]. All
+        terminations equal to 1 give back the cascade model.
+
+        :param termination: List of termination probabilities, one per position.
+        """
+        assert len(termination) == num_positions, "Need one termination probability per position."
+        super().__init__(probabilities, num_positions, rng, tape)
+        self.termination = np.asarray(termination, dtype=float)
+
+    def clicks(self, rankings):
+        attracted = self.attraction_uniforms(rankings) < self.probabilities[rankings]
+        stops = attracted & (self.rng.random(rankings.shape) < self.termination)
+        # A position is examined if no earlier position ended the session
+        stopped_before = np.cumsum(stops, axis=1) - stops
+        return (attracted & (stopped_before == 0)).astype(np.uint8)
+
+def only_first(hits):
+    """Keep only the first True of each row, as a uint8 click matrix."""
+    first = np.cumsum(hits, axis=1) == 1
+    return (hits & first).astype(np.uint8)
+
+def first_click(clicks):
+    """Index of the first click in each row, num_positions for rows without clicks."""
+    clicks = np.asarray(clicks)
+    return np.where(clicks.any(axis=1), clicks.argmax(axis=1), clicks.shape[1])
+
+def last_click(clicks):
+    """Index of the last click in each row (the examination boundary under DCM)."""
+    clicks = np.asarray(clicks)
+    last = clicks.shape[1] - 1 - clicks[:, ::-1].argmax(axis=1)
+    return np.where(clicks.any(axis=1), last, clicks.shape[1])
+
+def users_per_second(model, num_users=10 ** 6, repeats=3):
+    """Throughput of model.recommend_batch on random rankings."""
+    rankings = model.rng.integers(0, model.num_arms, size=(num_users, model.num_positions))
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.recommend_batch(rankings)
+        best = min(best, time.perf_counter() - start)
+    return num_users / best
+
+if __name__ == "__main__":
+    num_arms = 100
+    num_positions = 5
+    rng = np.random.default_rng(0)
+    probabilities = rng.uniform(0, 1, num_arms)
+
+    models = {
+        "cascade": CascadeModel(probabilities, num_positions, rng=rng),
+        "pbm": PositionBasedModel(probabilities, num_positions, [1 / (i + 1) for i in range(num_positions)], rng=rng),
+        "dcm": DependentClickModel(probabilities, num_positions, [0.6] * num_positions, rng=rng),
+    }
+    for name, model in models.items():
+        print(f"{name}: {users_per_second(model):,.0f} users/s")
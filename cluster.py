@@ -0,0 +1,326 @@
+import numpy as np
+import importlib
+import io
+import itertools
+import os
+import pickle
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+import zlib
+from collections import deque
+
+# Wire format: every message is a u64 length followed by a pickled dict.
+# Pickle is only safe between trusted hosts; run the cluster on a private network.
+FRAME = struct.Struct("<Q")
+
+def send_message(sock, message, lock=None):
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    data = FRAME.pack(len(payload)) + payload
+    if lock is None:
+        sock.sendall(data)
+    else:
+        with lock:
+            sock.sendall(data)
+
+def _recv_exact(sock, n):
+    chunks = []
+    while n:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed.")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+def recv_message(sock):
+    (length,) = FRAME.unpack(_recv_exact(sock, FRAME.size))
+    return pickle.loads(_recv_exact(sock, length))
+
+def compress_arrays(arrays):
+    """Dict of name -> array to dict of name -> zlib-compressed .npy bytes."""
+    out = {}
+    for name, array in arrays.items():
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(array))
+        out[name] = zlib.compress(buffer.getvalue(), 1)
+    return out
+
+def decompress_arrays(blobs):
+    return {name: np.load(io.BytesIO(zlib.decompress(blob))) for name, blob in blobs.items()}
+
+def parse_address(address):
+    """"host:port" for TCP or "unix:/path/to/socket" for a Unix domain socket."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, port = address.rsplit(":", 1)
+    return socket.AF_INET, (host, int(port))
+
+# Simulators a worker can run, name -> function(config, seed) returning a dict of arrays.
+# Scripts such as problem_c.py run their experiment at import time, so only importable
+# engines are registered; "module:function" specs are resolved with importlib.
+def _lockstep(config, seed):
+    from lockstep import simulate_lockstep
+    regret = simulate_lockstep(config["total_rounds"], config.get("num_instances", 1), config["num_arms"],
+                               config["num_positions"], np.random.default_rng(seed),
+                               config.get("record_every", 1), config.get("precision", "float64"))
+    return {"regret": regret}
+
+def _sweep_group(config, seed):
+    from sweep import ParameterSweep, run_group
+    sweep = ParameterSweep(config["total_rounds"], [config["num_positions"]], [config["indiv_arms"]],
+                           [config["num_players"]], config.get("explorations", (1.5,)), [seed],
+                           config.get("record_every", 100))
+    rows = [row for task in sweep.tasks for row in run_group(task)]
+    return {
+        "exploration": np.array([row["exploration"] for row in rows]),
+        "final_regret": np.array([row["final_regret"] for row in rows]),
+        "regret": np.stack([row["regret"] for row in rows]),
+    }
+
+def _large_catalog(config, seed):
+    from large_catalog import simulate_large_catalog_ucb
+    regret = simulate_large_catalog_ucb(config["total_rounds"], config["num_arms"], config["num_positions"],
+                                        rng=np.random.default_rng(seed))
+    return {"regret": np.asarray(regret)}
+
+SIMULATORS = {
+    "lockstep": _lockstep,
+    "sweep_group": _sweep_group,
+    "large_catalog": _large_catalog,
+}
+
+def resolve_simulator(name):
+    if name in SIMULATORS:
+        return SIMULATORS[name]
+    module, function = name.split(":")
+    return getattr(importlib.import_module(module), function)
+
+class Coordinator:
+    def __init__(self, address, heartbeat_timeout=30.0, max_attempts=3):
+        """
+        Hands out (simulator, config, seed) tasks to worker daemons and collects results.
+
+        Every worker connection holds at most one task, so fast workers simply come back
+        for more and uneven task sizes balance themselves. Workers acknowledge a task
+        before running it and only acknowledged tasks count as attempts. A worker that
+        disconnects or sends nothing (neither result nor heartbeat) for heartbeat_timeout
+        seconds is considered dead and its task goes back to the front of the queue.
+
+        :param address: "host:port" (port 0 picks a free port) or "unix:/path".
+        :param heartbeat_timeout: Seconds of silence after which a worker is dropped.
+        :param max_attempts: A task failing (or losing its worker) this many times is given up.
+        """
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        family, bind_address = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.unlink(bind_address)
+        self.server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(bind_address)
+        self.server.listen()
+        if family == socket.AF_INET:
+            self.address = f"{bind_address[0]}:{self.server.getsockname()[1]}"
+        else:
+            self.address = address
+
+        self.lock = threading.Condition()
+        self.pending = deque()
+        self.tasks = {}
+        self.attempts = {}
+        self.results = {}
+        self.failures = {}
+        self.workers = {}  # worker name -> number of tasks completed
+        self.ids = itertools.count()
+        self.closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def submit(self, simulator, config, seed):
+        """Queue one task and return its id."""
+        with self.lock:
+            task_id = next(self.ids)
+            self.tasks[task_id] = {"id": task_id, "simulator": simulator, "config": config, "seed": seed}
+            self.attempts[task_id] = 0
+            self.pending.append(task_id)
+            self.lock.notify_all()
+        return task_id
+
+    def wait(self, timeout=None):
+        """
+        Block until every submitted task has a result or has failed.
+
+        :return: (results, failures), dicts of task id -> array dict / error text.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while len(self.results) + len(self.failures) < len(self.tasks):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"{len(self.tasks) - len(self.results) - len(self.failures)} tasks unfinished.")
+                self.lock.wait(remaining)
+            return dict(self.results), dict(self.failures)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        self.server.close()
+        if self.server.family == socket.AF_UNIX:
+            os.unlink(self.address[len("unix:"):])
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_worker, args=(conn,), daemon=True).start()
+
+    def _next_task(self):
+        with self.lock:
+            while not self.pending and not self.closed:
+                self.lock.wait()
+            if self.closed:
+                return None
+            return self.tasks[self.pending.popleft()]
+
+    def _release(self, task):
+        """Put back a task that never reached a live worker, without using an attempt."""
+        with self.lock:
+            self.pending.appendleft(task["id"])
+            self.lock.notify_all()
+
+    def _requeue(self, task, error):
+        with self.lock:
+            task_id = task["id"]
+            if task_id in self.results or task_id in self.failures:
+                return
+            if self.attempts[task_id] >= self.max_attempts:
+                self.failures[task_id] = error
+            else:
+                self.pending.appendleft(task_id)
+            self.lock.notify_all()
+
+    def _serve_worker(self, conn):
+        conn.settimeout(self.heartbeat_timeout)
+        task = None
+        accepted = False
+        try:
+            hello = recv_message(conn)
+            name = hello["worker"]
+            send_message(conn, {"type": "welcome", "heartbeat_interval": self.heartbeat_timeout / 3})
+            with self.lock:
+                self.workers.setdefault(name, 0)
+            while True:
+                task = self._next_task()
+                if task is None:
+                    send_message(conn, {"type": "shutdown"})
+                    return
+                send_message(conn, {"type": "task", **task})
+                # Only a worker that acknowledges the task uses up an attempt; a
+                # connection that died while idle just hands the task back
+                if recv_message(conn)["type"] != "accepted":
+                    raise ConnectionError("Task was not acknowledged.")
+                with self.lock:
+                    self.attempts[task["id"]] += 1
+                accepted = True
+                while True:
+                    message = recv_message(conn)
+                    if message["type"] != "heartbeat":
+                        break
+                if message["type"] == "error":
+                    self._requeue(task, message["traceback"])
+                else:
+                    with self.lock:
+                        self.results[task["id"]] = decompress_arrays(message["arrays"])
+                        self.workers[name] += 1
+                        self.lock.notify_all()
+                task = None
+                accepted = False
+        except (ConnectionError, OSError, EOFError) as error:
+            # Covers disconnects and heartbeat timeouts (socket.timeout is an OSError)
+            if task is not None and accepted:
+                self._requeue(task, f"worker lost: {error!r}")
+            elif task is not None:
+                self._release(task)
+        finally:
+            conn.close()
+
+def run_worker(address, name=None):
+    """
+    Worker daemon: connect to the coordinator and run tasks until told to shut down.
+
+    While a task runs, a background thread sends heartbeats at the interval the
+    coordinator asked for, so long simulations are not mistaken for dead workers.
+    """
+    family, connect_address = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(connect_address)
+    send_lock = threading.Lock()
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    send_message(sock, {"type": "hello", "worker": name}, send_lock)
+    try:
+        heartbeat_interval = recv_message(sock)["heartbeat_interval"]
+        while True:
+            message = recv_message(sock)
+            if message["type"] == "shutdown":
+                return
+            send_message(sock, {"type": "accepted", "id": message["id"]}, send_lock)
+            done = threading.Event()
+
+            def heartbeat():
+                while not done.wait(heartbeat_interval):
+                    send_message(sock, {"type": "heartbeat"}, send_lock)
+
+            beat = threading.Thread(target=heartbeat, daemon=True)
+            beat.start()
+            try:
+                arrays = resolve_simulator(message["simulator"])(message["config"], message["seed"])
+                reply = {"type": "result", "id": message["id"], "arrays": compress_arrays(arrays)}
+            except Exception:
+                reply = {"type": "error", "id": message["id"], "traceback": traceback.format_exc()}
+            done.set()
+            beat.join()
+            send_message(sock, reply, send_lock)
+    except ConnectionError:
+        return
+    finally:
+        sock.close()
+
+def start_local_workers(address, num_workers):
+    """Start worker daemons as local processes (for testing on one machine)."""
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=run_worker, args=(address,), daemon=True) for _ in range(num_workers)]
+    for process in processes:
+        process.start()
+    return processes
+
+if __name__ == "__main__":
+    # python cluster.py worker HOST:PORT [processes]   start worker daemons on this host
+    # python cluster.py                                local scaling demo
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        count = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+        for process in start_local_workers(sys.argv[2], count):
+            process.join()
+        sys.exit()
+
+    config = {"total_rounds": 5000, "num_instances": 1, "num_arms": 20, "num_positions": 3, "record_every": 100}
+    for num_workers in [1, 2, 4]:
+        coordinator = Coordinator("127.0.0.1:0")
+        workers = start_local_workers(coordinator.address, num_workers)
+        start = time.perf_counter()
+        for seed in range(16):
+            coordinator.submit("lockstep", config, seed)
+        results, failures = coordinator.wait()
+        elapsed = time.perf_counter() - start
+        coordinator.close()
+        for worker in workers:
+            worker.join()
+        final = np.mean([r["regret"][-1].mean() for r in results.values()])
+        print(f"{num_workers} workers: {len(results)} tasks in {elapsed:.2f}s, {len(failures)} failed, mean final regret {final:.2f}")
@@ -0,0 +1,61 @@
+import numpy as np
+
+class ConvergenceController:
+    def __init__(self, patience=1000, tol=1e-12):
+        """
+        Detects when a simulation has reached a state whose future regret is known.
+
+        The simulator reports its policy state once per round (or phase) together with
+        that round's regret. A state flagged absorbing (e.g. problem_b.py's desired_set
+        down to num_positions arms) stops the run at once; otherwise the run is treated
+        as converged once the same state and the same per-round regret have been
+        reported for `patience` rounds after they were first seen.
+
+        :param patience: Rounds without a change needed without an absorbing flag.
+        :param tol: Tolerance when comparing per-round regrets.
+        """
+        self.patience = patience
+        self.tol = tol
+        self.state = None
+        self.round_regret = None
+        self.streak = 0
+        self.stopped_at = None
+        self.exact = False
+
+    def observe(self, t, state, round_regret, absorbing=False, rounds=1):
+        """
+        :param t: 0-based index of the last round the simulator has recorded.
+        :param state: Hashable summary of the policy (None for "still learning").
+        :param round_regret: Regret of this round.
+        :param absorbing: True when the state provably never changes again.
+        :param rounds: Rounds since the previous observation (the phase length for
+                       simulators that observe once per phase, like problem_c.py).
+        :return: True when the rest of the run can be extrapolated.
+        """
+        if state is not None and state == self.state and abs(round_regret - self.round_regret) <= self.tol:
+            self.streak += rounds
+        else:
+            self.streak = 0
+        self.state = state
+        self.round_regret = round_regret
+
+        if state is not None and (absorbing or self.streak >= self.patience):
+            self.stopped_at = t
+            self.exact = absorbing
+            return True
+        return False
+
+    def extrapolate(self, current_regret, remaining, round_regret=None):
+        """
+        Cumulative regret of the remaining rounds.
+
+        Accumulated round by round, as the simulators do, so an exact extrapolation
+        gives the same floats as the full run.
+
+        :param round_regret: Per-round regret, a constant or an array of length remaining
+                             (defaults to the last observed one).
+        :return: List of length remaining continuing from current_regret.
+        """
+        r = self.round_regret if round_regret is None else round_regret
+        steps = np.broadcast_to(np.asarray(r, dtype=float), (remaining,))
+        return np.cumsum(np.concatenate([[current_regret], steps]))[1:].tolist()
@@ -0,0 +1,137 @@
+import numpy as np
+from cascade_common import CascadingBandit, compute_ucb, optimize, calc_score, convert_to_int, random_probabilities
+from topk_joint import k_best_joint_arms
+
+class FactorizedCascadeUCB:
+    def __init__(self, indiv_arms, num_players, num_positions):
+        """
+        Cascade UCB learner for joint arms that only keeps per-player statistics.
+
+        Instead of one mean/count per joint arm (indiv_arms ** num_players of them),
+        every player keeps a mean/count per individual arm. The score of a joint arm
+        is the average of its players' UCB values, and the best joint arms are found
+        with a lazy k-best enumeration over the players' sorted UCB lists.
+
+        :param indiv_arms: Number of arms available to each player.
+        :param num_players: Number of players.
+        :param num_positions: Number of joint arms to recommend.
+        """
+        assert num_positions <= indiv_arms ** num_players, "Number of positions cannot exceed number of joint arms."
+
+        self.indiv_arms = indiv_arms
+        self.num_players = num_players
+        self.num_positions = num_positions
+        self.empirical_means = np.zeros((num_players, indiv_arms))
+        self.counts = np.zeros((num_players, indiv_arms))
+        self.t = 1
+
+    def player_ucb(self):
+        """UCB matrix of shape (num_players, indiv_arms)."""
+        return np.vstack([compute_ucb(self.empirical_means[p], self.counts[p], self.t) for p in range(self.num_players)])
+
+    def rank(self):
+        """
+        Pick the num_positions best joint arms under the factorized scores.
+
+        :return: (joint arms as an int array of shape (num_positions, num_players), their scores)
+        """
+        ucb = self.player_ucb()
+        joint_arms, scores = k_best_joint_arms(list(ucb), self.num_positions)
+        return joint_arms, scores / self.num_players
+
+    def select(self):
+        """Joint arms to recommend, encoded with convert_to_int."""
+        joint_arms, _ = self.rank()
+        return [convert_to_int(arm, self.num_players, self.indiv_arms) for arm in joint_arms], joint_arms
+
+    def update(self, joint_arms, click):
+        """
+        Apply cascade feedback: every examined joint arm updates each of its players' arms.
+
+        :param joint_arms: Recommended joint arms, shape (num_positions, num_players).
+        :param click: Clicked position, or num_positions if there was no click.
+        """
+        players = np.arange(self.num_players)
+        for i, arm in enumerate(joint_arms[:click + 1]):
+            reward = 1 if i == click else 0
+            self.counts[players, arm] += 1
+            self.empirical_means[players, arm] += (reward - self.empirical_means[players, arm]) / self.counts[players, arm]
+        self.t += 1
+
+def simulate_dense_ucb(total_rounds, click_probabilities, num_positions):
+    """
+    Reference learner with one mean/count per joint arm, as in problem_a.py.
+
+    :return: (cumulative regret list, recommendations of the last round)
+    """
+    num_arms = len(click_probabilities)
+    bandit = CascadingBandit(num_arms, click_probabilities, num_positions)
+    empirical_means = np.zeros(num_arms)
+    counts = np.zeros(num_arms)
+    optimal_score = optimize(click_probabilities, num_positions)
+    current_regret = 0
+    regret = []
+
+    for t in range(1, total_rounds + 1):
+        ucb_values = compute_ucb(empirical_means, counts, t)
+        selected_arms = np.argsort(ucb_values)[-num_positions:][::-1]
+        click = bandit.recommend(selected_arms)
+
+        for i, arm in enumerate(selected_arms[:click + 1]):
+            reward = 1 if i == click else 0
+            counts[arm] += 1
+            empirical_means[arm] = ((empirical_means[arm] * (counts[arm] - 1)) + reward) / counts[arm]
+
+        current_regret += optimal_score - calc_score(selected_arms, click_probabilities, num_positions)
+        regret.append(current_regret)
+
+    return regret, [int(a) for a in selected_arms]
+
+def simulate_factorized_ucb(total_rounds, click_probabilities, indiv_arms, num_players, num_positions):
+    """
+    Run FactorizedCascadeUCB on a joint-arm instance.
+
+    :return: (cumulative regret list, recommendations of the last round)
+    """
+    bandit = CascadingBandit(len(click_probabilities), click_probabilities, num_positions)
+    learner = FactorizedCascadeUCB(indiv_arms, num_players, num_positions)
+    optimal_score = optimize(click_probabilities, num_positions)
+    current_regret = 0
+    regret = []
+
+    for t in range(total_rounds):
+        recommendations, joint_arms = learner.select()
+        click = bandit.recommend(recommendations)
+        learner.update(joint_arms, click)
+
+        current_regret += optimal_score - calc_score(recommendations, click_probabilities, num_positions)
+        regret.append(current_regret)
+
+    return regret, recommendations
+
+def compare_with_dense(total_rounds, indiv_arms, num_players, num_positions):
+    """
+    Run the dense and factorized learners on the same random instance.
+
+    :return: Dict with both final regrets and how much the last rankings overlap with
+             each other and with the optimal set of joint arms.
+    """
+    click_probabilities = random_probabilities(indiv_arms ** num_players)
+    optimal_set = set(np.argsort(click_probabilities)[-num_positions:].tolist())
+
+    dense_regret, dense_picks = simulate_dense_ucb(total_rounds, click_probabilities, num_positions)
+    fact_regret, fact_picks = simulate_factorized_ucb(total_rounds, click_probabilities, indiv_arms, num_players, num_positions)
+
+    return {
+        "dense_regret": dense_regret[-1],
+        "factorized_regret": fact_regret[-1],
+        "pick_overlap": len(set(dense_picks) & set(fact_picks)) / num_positions,
+        "dense_optimal_overlap": len(set(dense_picks) & optimal_set) / num_positions,
+        "factorized_optimal_overlap": len(set(fact_picks) & optimal_set) / num_positions,
+    }
+
+if __name__ == "__main__":
+    # Small configurations where the dense learner is still cheap
+    for indiv_arms, num_players, num_positions in [(3, 2, 3), (5, 2, 3), (4, 3, 3)]:
+        result = compare_with_dense(20000, indiv_arms, num_players, num_positions)
+        print(f"L={indiv_arms} M={num_players} K={num_positions}: {result}")
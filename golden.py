@@ -0,0 +1,365 @@
+import numpy as np
+import ast
+import contextlib
+import io
+import os
+import random
+import time
+from cascade_common import CascadeUCB, CascadingBandit, random_probabilities
+from early_stop import ConvergenceController
+from lockstep import LockstepCascadeUCB, simulate_lockstep
+from multi_agent import MultiAgentCascadeUCB
+from sweep import click_uniforms
+from tapes import TAPE_CHUNK, ClickTape, attach_tape
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def load_reference(filename, **overrides):
+    """
+    Import the definitions of one of the simulation scripts without running it.
+
+    problem_a.py and friends run a 10^6-round experiment and plot it at import time,
+    so only imports, classes and functions are kept (matplotlib is dropped, none of
+    the functions plot). Module-level constants the functions read, such as T in
+    problem_c.py, are passed as overrides.
+
+    :return: Namespace dict of the script.
+    """
+    path = os.path.join(HERE, filename)
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    body = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            body.append(node)
+        elif isinstance(node, ast.Import) and not any(a.name.startswith("matplotlib") for a in node.names):
+            body.append(node)
+        elif isinstance(node, ast.ImportFrom) and not (node.module or "").startswith("matplotlib"):
+            body.append(node)
+    tree.body = body
+    namespace = {"__name__": f"reference_{filename}"}
+    exec(compile(tree, path, "exec"), namespace)
+    namespace.update(overrides)
+    return namespace
+
+def recording(bandit_class, log):
+    """Subclass of an environment class that appends (ranking, click) of every round to log."""
+    class Recording(bandit_class):
+        def recommend(self, selected_arms):
+            click = super().recommend(selected_arms)
+            # Joint arms (tuples) become [arm1, arm2] lists, plain arms ints
+            log.append((np.asarray(selected_arms).tolist(), click))
+            return click
+    return Recording
+
+def seed_all(seed):
+    """The scripts draw instances from `random` and clicks from np.random; seed both."""
+    random.seed(seed)
+    np.random.seed(seed)
+
+def compare_traces(reference, candidate, atol=1e-9):
+    """
+    Exact comparison of two runs.
+
+    :param reference, candidate: Dicts with "trace" (list of (ranking, click)) and "regret".
+    :return: None when equal, otherwise a message naming the first difference.
+    """
+    for t, (a, b) in enumerate(zip(reference["trace"], candidate["trace"])):
+        if a != b:
+            return f"round {t + 1}: reference {a}, candidate {b}"
+    if len(reference["trace"]) != len(candidate["trace"]):
+        return f"trace lengths {len(reference['trace'])} and {len(candidate['trace'])}"
+    r, c = np.asarray(reference["regret"]), np.asarray(candidate["regret"])
+    if r.shape != c.shape:
+        return f"regret lengths {len(r)} and {len(c)}"
+    bad = np.flatnonzero(~np.isclose(r, c, rtol=1e-12, atol=atol))
+    if len(bad):
+        return f"regret differs from round {bad[0] + 1}: {r[bad[0]]} vs {c[bad[0]]}"
+    return None
+
+def compare_means(reference, candidate, z=3.29):
+    """
+    Two-sample test that two sets of per-seed values have the same mean.
+
+    Welch's statistic with a normal threshold (z = 3.29 is a two-sided p of 0.001), which
+    is adequate for the 30+ seeds the fixtures use.
+
+    :return: None when the means are compatible, otherwise a message.
+    """
+    reference, candidate = np.asarray(reference, dtype=float), np.asarray(candidate, dtype=float)
+    se = np.sqrt(reference.var(ddof=1) / len(reference) + candidate.var(ddof=1) / len(candidate))
+    gap = abs(reference.mean() - candidate.mean())
+    if gap > z * se + 1e-12:
+        return f"mean {reference.mean():.4f} vs {candidate.mean():.4f}, |gap| {gap:.4f} > {z} * se {se:.4f}"
+    return None
+
+# Runners: every one seeds the global generators itself so a pair can be replayed.
+
+def reference_mcascade_ucb(seed, total_rounds, num_arms, num_positions):
+    """problem_a.py's simulate_mcascade_ucb, unchanged."""
+    trace = []
+    namespace = load_reference("problem_a.py")
+    namespace["CascadingBandit"] = recording(namespace["CascadingBandit"], trace)
+    seed_all(seed)
+    regret = namespace["simulate_mcascade_ucb"](total_rounds, num_arms, num_positions)
+    return {"trace": trace, "regret": regret}
+
+def candidate_cascade_ucb(seed, total_rounds, num_arms, num_positions, precision="float64"):
+    """The same experiment with cascade_common.CascadeUCB."""
+    trace = []
+    seed_all(seed)
+    click_probabilities = random_probabilities(num_arms)
+    bandit = recording(CascadingBandit, trace)(num_arms, click_probabilities, num_positions)
+    learner = CascadeUCB(num_arms, num_positions, precision)
+    p = np.array(click_probabilities)
+    optimal_score = 1 - np.prod(1 - np.sort(p)[-num_positions:])
+    current_regret = 0
+    regret = []
+    for t in range(total_rounds):
+        selected_arms = learner.select()
+        click = bandit.recommend(selected_arms)
+        learner.update(selected_arms, click)
+        current_regret += optimal_score - (1 - np.prod(1 - p[selected_arms]))
+        regret.append(current_regret)
+    return {"trace": trace, "regret": regret}
+
+def candidate_lockstep(seed, total_rounds, num_arms, num_positions):
+    """One LockstepCascadeUCB instance fed the reference's click stream (see lockstep_replicas)."""
+    return lockstep_replicas([seed], total_rounds, num_arms, num_positions)[0]
+
+def lockstep_replicas(seeds, total_rounds, num_arms, num_positions):
+    """
+    One LockstepCascadeUCB with an instance per seed, each fed the click stream its own
+    reference run would see: the instance is drawn from `random` seeded with the seed
+    and uniforms from a RandomState of the seed (the stream np.random.seed gives),
+    position by position up to the first click, as in CascadingBandit.recommend.
+
+    :return: One dict with "trace" and "regret" per seed.
+    """
+    probabilities = []
+    for seed in seeds:
+        random.seed(seed)
+        probabilities.append(random_probabilities(num_arms))
+    streams = [np.random.RandomState(seed) for seed in seeds]
+    engine = LockstepCascadeUCB(np.array(probabilities), num_positions)
+    runs = [{"trace": [], "regret": []} for _ in seeds]
+    current_regret = np.zeros(len(seeds))
+    for t in range(total_rounds):
+        uniforms = np.full((len(seeds), num_positions), np.inf)
+        for b, selected in enumerate(engine.select()):
+            for i, arm in enumerate(selected):
+                uniforms[b, i] = streams[b].rand()
+                if uniforms[b, i] < probabilities[b][arm]:
+                    break
+        selected, clicks, round_regret = engine.step(uniforms)
+        current_regret += round_regret
+        for b, run in enumerate(runs):
+            run["trace"].append(([int(a) for a in selected[b]], int(clicks[b])))
+            run["regret"].append(current_regret[b])
+    return runs
+
+def reference_multiplayer(seed):
+    """cascading.py's simulate_multiplayer_cascading_bandit (6 x 6 joint arms, 8 positions, 1000 rounds), unchanged."""
+    trace = []
+    namespace = load_reference("cascading.py")
+    namespace["MultiplayerCascadingBandit"] = recording(namespace["MultiplayerCascadingBandit"], trace)
+    seed_all(seed)
+    # The script prints every round
+    with contextlib.redirect_stdout(io.StringIO()):
+        score = namespace["simulate_multiplayer_cascading_bandit"]()
+    return {"trace": trace, "regret": [score]}
+
+def candidate_multiplayer(seed, player1_arms=6, player2_arms=6, num_positions=8, total_rounds=1000):
+    """
+    The same loop on flat joint arms: the UCB of all 36 joint arms is one array
+    expression and only the examined arms' means are updated. Clicks come from
+    cascade_common.CascadingBandit, which draws np.random the same way.
+    """
+    trace = []
+    seed_all(seed)
+    # Row-major, like the script's nested list
+    probabilities = [random.uniform(0, 1) for _ in range(player1_arms * player2_arms)]
+    bandit = CascadingBandit(player1_arms * player2_arms, probabilities, num_positions)
+    empirical_means = np.zeros(player1_arms * player2_arms)
+    observations = np.zeros(player1_arms * player2_arms)
+    log_term = 1.5 * np.log(total_rounds)
+    score = 0
+    for t in range(total_rounds):
+        with np.errstate(divide="ignore"):
+            UCB = np.where(observations == 0, np.inf, empirical_means + (log_term / observations) ** 0.5)
+        selected_arms = np.argsort(UCB)[::-1][:num_positions]
+        click = bandit.recommend(selected_arms)
+        if click != num_positions:
+            score += 1
+        examined = selected_arms[:click + 1]
+        inc = (np.arange(len(examined)) == click).astype(float)
+        empirical_means[examined] = (empirical_means[examined] * observations[examined] + inc) / (observations[examined] + 1)
+        observations[examined] += 1
+        trace.append((np.stack(np.unravel_index(selected_arms, (player1_arms, player2_arms)), axis=1).tolist(), click))
+    return {"trace": trace, "regret": [score]}
+
+def reference_elimination(seed, total_rounds, controller=None):
+    """problem_b.py's elimination loop, optionally with its early stop."""
+    namespace = load_reference("problem_b.py")
+    seed_all(seed)
+    return namespace["simulate_cascading_bandit"](total_rounds, controller=controller)
+
+def reference_etc(seed, total_rounds, controller=None):
+    """problem_c.py's explore-then-commit loop, optionally with its early stop."""
+    namespace = load_reference("problem_c.py", T=total_rounds)
+    seed_all(seed)
+    return namespace["simulate_cascading_bandit"](total_rounds, controller=controller)[:total_rounds]
+
+def stopped_etc(seed, total_rounds, controller):
+    """reference_etc with a controller that must actually stop the run."""
+    regret = reference_etc(seed, total_rounds, controller)
+    assert controller.stopped_at is not None, f"seed {seed}: the early stop never triggered in {total_rounds} rounds."
+    return regret
+
+# Fixtures: small configurations that run in seconds.
+#   exact: name -> (reference runner, candidate runner, kwargs); traces must match for every seed
+#   statistical: name -> (function(seed) -> reference value, function(seed) -> candidate value)
+#
+# Candidates that draw their clicks from a different stream (simulate_lockstep) or keep
+# state in another precision can only match the reference's regret distribution, so
+# they are checked statistically.
+
+EXACT = {
+    "CascadeUCB vs problem_a": (reference_mcascade_ucb, candidate_cascade_ucb, {"total_rounds": 2000, "num_arms": 8, "num_positions": 3}),
+    "lockstep (same clicks) vs problem_a": (reference_mcascade_ucb, candidate_lockstep, {"total_rounds": 2000, "num_arms": 8, "num_positions": 3}),
+    "flat joint-arm UCB vs cascading.py": (reference_multiplayer, candidate_multiplayer, {}),
+}
+
+STATISTICAL = {
+    "CascadeUCB float32 vs problem_a": (
+        lambda s: reference_mcascade_ucb(s, 2000, 8, 3)["regret"][-1],
+        lambda s: candidate_cascade_ucb(s, 2000, 8, 3, precision="float32")["regret"][-1],
+    ),
+    "simulate_lockstep vs problem_a": (
+        lambda s: reference_mcascade_ucb(s, 2000, 8, 3)["regret"][-1],
+        lambda s: simulate_lockstep(2000, 1, 8, 3, np.random.default_rng(s), record_every=2000)[-1, 0],
+    ),
+    # With 5000 rounds of patience the controller stops problem_c.py after round 5969
+    # (0-based; 20,000 rounds, any seed)
+    "problem_c early stop": (
+        lambda s: reference_etc(s, 20000)[-1],
+        lambda s: stopped_etc(s, 20000, ConvergenceController(patience=5000))[-1],
+    ),
+}
+
+def check_update_batch(seed, total_rounds=500, num_arms=10, num_positions=3):
+    """CascadeUCB.update_batch must leave the same state as update() round by round."""
+    rng = np.random.default_rng(seed)
+    rankings = np.array([rng.permutation(num_arms)[:num_positions] for _ in range(total_rounds)])
+    clicks = rng.integers(0, num_positions + 1, total_rounds)
+    sequential = CascadeUCB(num_arms, num_positions)
+    for ranking, click in zip(rankings, clicks):
+        sequential.update(ranking, int(click))
+    batched = CascadeUCB(num_arms, num_positions)
+    batched.update_batch(rankings, clicks)
+    if not (np.array_equal(sequential.counts, batched.counts) and np.allclose(sequential.empirical_means, batched.empirical_means)
+            and sequential.t == batched.t):
+        return "update_batch state differs from sequential updates"
+    return None
+
+# problem_b.py's desired_set only shrinks to num_positions arms on some instances; on
+# these seeds it does within 5000 rounds (t = 3511 and 3509)
+ELIMINATION_STOP_SEEDS = (24, 55)
+
+def check_elimination_early_stop(seed, total_rounds=5000):
+    """problem_b.py's absorbing early stop must trigger and reproduce the full curve."""
+    full = {"trace": [], "regret": reference_elimination(seed, total_rounds)}
+    controller = ConvergenceController()
+    stopped = {"trace": [], "regret": reference_elimination(seed, total_rounds, controller)}
+    if controller.stopped_at is None:
+        return f"the early stop never triggered in {total_rounds} rounds"
+    return compare_traces(full, stopped)
+
+def check_multi_agent_run(seed, total_rounds=20000, num_arms=5, configs=((2, 0.3), (5, 0.7), (3, 0.0))):
+    """
+    MultiAgentCascadeUCB.run() must leave the state step() leaves on the same uniforms,
+    bit for bit; non-dyadic collision penalties catch rounding differences.
+    """
+    probabilities = np.random.default_rng([seed, 0]).uniform(0, 1, num_arms)
+    for num_agents, penalty in configs:
+        blocked = MultiAgentCascadeUCB(probabilities, num_agents, total_rounds, penalty, rng=np.random.default_rng(seed))
+        stepped = MultiAgentCascadeUCB(probabilities, num_agents, total_rounds, penalty, rng=np.random.default_rng(seed))
+        curve = blocked.run(total_rounds, record_every=100)
+        total = 0.0
+        stepped_curve = []
+        for t in range(1, total_rounds + 1):
+            total += stepped.step()[1]
+            if t % 100 == 0:
+                stepped_curve.append(total)
+        for name in ("counts", "sums", "ucb", "scores"):
+            if not np.array_equal(getattr(blocked, name), getattr(stepped, name)):
+                return f"{num_agents} agents, penalty {penalty}: {name} differ"
+        if curve != stepped_curve:
+            return f"{num_agents} agents, penalty {penalty}: reward curves differ"
+    return None
+
+def check_lockstep_replicas(seed, num_instances=4, total_rounds=2000, num_arms=8, num_positions=3):
+    """Every instance of one lockstep engine must reproduce its own problem_a run."""
+    seeds = [seed * num_instances + b for b in range(num_instances)]
+    for seed_b, run in zip(seeds, lockstep_replicas(seeds, total_rounds, num_arms, num_positions)):
+        failure = compare_traces(reference_mcascade_ucb(seed_b, total_rounds, num_arms, num_positions), run)
+        if failure is not None:
+            return f"instance seeded {seed_b}: {failure}"
+    return None
+
+def check_click_tapes(seed, num_arms=7, total_rounds=TAPE_CHUNK + 1000, num_positions=3):
+    """
+    sweep.click_uniforms must stream exactly the rows of the ClickTape of the seed
+    (across a chunk boundary), and a taped environment must draw its clicks from row t
+    in round t, whatever the number of recommend() calls per round.
+    """
+    tape = ClickTape.create(total_rounds, num_arms, seed)
+    if not np.array_equal(np.array(list(click_uniforms(seed, num_arms, total_rounds))), tape.uniforms):
+        return "sweep.click_uniforms differs from ClickTape.create"
+    probabilities = list(np.random.default_rng([seed, 0]).uniform(0, 1, num_arms))
+    bandit = attach_tape(CascadingBandit(num_arms, probabilities, num_positions), tape, calls_per_round=2)
+    rankings = np.random.default_rng([seed, 2]).permuted(np.tile(np.arange(num_arms), (total_rounds, 1)), axis=1)[:, :num_positions]
+    for t, ranking in enumerate(rankings):
+        hits = tape.uniforms[t, ranking] < np.array(probabilities)[ranking]
+        expected = int(hits.argmax()) if hits.any() else num_positions
+        clicks = [bandit.recommend(ranking), bandit.recommend(ranking)]
+        if clicks != [expected, expected]:
+            return f"round {t + 1}: taped clicks {clicks}, expected {expected} from row {t}"
+    return None
+
+def run_harness(seeds=range(5), statistical_seeds=range(40), names=None):
+    """
+    Run every fixture (or those in names) and print one line per check.
+
+    :return: Dict of check name -> None (passed) or the first failure message.
+    """
+    results = {}
+    checks = []
+    for name, (reference, candidate, kwargs) in EXACT.items():
+        checks.append((name, lambda s, r=reference, c=candidate, k=kwargs: compare_traces(r(s, **k), c(s, **k)), seeds))
+    checks.append(("update_batch vs update", check_update_batch, seeds))
+    checks.append(("problem_b early stop", check_elimination_early_stop, ELIMINATION_STOP_SEEDS))
+    checks.append(("lockstep replicas vs problem_a", check_lockstep_replicas, seeds))
+    checks.append(("click tapes", check_click_tapes, seeds))
+    checks.append(("multi_agent run vs step", check_multi_agent_run, seeds))
+    for name, (reference, candidate) in STATISTICAL.items():
+        checks.append((name, lambda _, r=reference, c=candidate: compare_means([r(s) for s in statistical_seeds], [c(s) for s in statistical_seeds]), [None]))
+
+    for name, check, check_seeds in checks:
+        if names is not None and name not in names:
+            continue
+        start = time.perf_counter()
+        failure = None
+        for seed in check_seeds:
+            failure = check(seed)
+            if failure is not None:
+                failure = failure if seed is None else f"seed {seed}: {failure}"
+                break
+        results[name] = failure
+        status = "ok" if failure is None else f"FAILED {failure}"
+        print(f"{name}: {status} ({time.perf_counter() - start:.1f}s)")
+    return results
+
+if __name__ == "__main__":
+    results = run_harness()
+    assert all(failure is None for failure in results.values()), "Golden-equivalence checks failed."
@@ -0,0 +1,118 @@
+import numpy as np
+from cascade_common import CascadingBandit, optimize, calc_score
+
+class CascadeLinUCB:
+    def __init__(self, features, num_positions, alpha=1.0, lam=1.0, sigma=1.0):
+        """
+        Cascading bandit learner with a linear click model p(arm) = x_arm . theta.
+
+        The inverse of the Gram matrix is cached and kept up to date with
+        Sherman-Morrison rank-one updates, so each examined item costs O(d^2)
+        and no matrix is ever inverted.
+
+        :param features: Array of shape (num_arms, d) with one feature vector per arm.
+        :param num_positions: Number of positions to recommend.
+        :param alpha: Width of the confidence bonus.
+        :param lam: Ridge regularization of the Gram matrix.
+        :param sigma: Assumed click noise scale.
+        """
+        self.features = np.asarray(features, dtype=float)
+        self.num_arms, self.d = self.features.shape
+        assert num_positions <= self.num_arms, "Number of positions cannot exceed number of arms."
+
+        self.num_positions = num_positions
+        self.alpha = alpha
+        self.sigma = sigma
+        self.M_inv = np.eye(self.d) / lam
+        self.b = np.zeros(self.d)
+        self.theta = np.zeros(self.d)
+
+    def scores(self):
+        """UCB of every arm from one (num_arms, d) x (d, d) product."""
+        XM = self.features @ self.M_inv
+        width = np.sqrt(np.maximum(np.einsum("ij,ij->i", XM, self.features), 0))
+        return self.features @ self.theta + self.alpha * width
+
+    def select(self):
+        """Arms to recommend, best score first."""
+        scores = self.scores()
+        top = np.argpartition(-scores, self.num_positions - 1)[:self.num_positions]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def update(self, selected_arms, click):
+        """
+        Apply cascade feedback to the examined items.
+
+        :param selected_arms: Recommended arms.
+        :param click: Clicked position, or num_positions if there was no click.
+        """
+        for i, arm in enumerate(selected_arms[:click + 1]):
+            reward = 1 if i == click else 0
+            x = self.features[arm] / self.sigma
+            Mx = self.M_inv @ x
+            self.M_inv -= np.outer(Mx, Mx) / (1 + x @ Mx)
+            self.b += x * reward / self.sigma
+        self.theta = self.M_inv @ self.b
+
+class CascadeLinTS(CascadeLinUCB):
+    def __init__(self, features, num_positions, v=1.0, lam=1.0, sigma=1.0):
+        """
+        Thompson sampling counterpart of CascadeLinUCB.
+
+        :param v: Scale of the posterior sample around the ridge estimate.
+        """
+        super().__init__(features, num_positions, alpha=0.0, lam=lam, sigma=sigma)
+        self.v = v
+
+    def scores(self):
+        """Expected clicks under one posterior sample of theta."""
+        cov = (self.v ** 2) * (self.M_inv + self.M_inv.T) / 2
+        theta = self.theta + np.linalg.cholesky(cov) @ np.random.randn(self.d)
+        return self.features @ theta
+
+def random_linear_instance(num_arms, d):
+    """
+    Non-negative unit-norm item features and a theta with every click probability in [0, 1].
+
+    :return: (features, click_probabilities)
+    """
+    features = np.random.rand(num_arms, d)
+    features /= np.linalg.norm(features, axis=1, keepdims=True)
+    theta = np.random.rand(d)
+    theta /= np.linalg.norm(theta)
+    click_probabilities = features @ theta
+    return features, list(click_probabilities)
+
+def simulate_cascade_linear(total_rounds, num_arms, num_positions, d, policy="ucb"):
+    """
+    Run CascadeLinUCB or CascadeLinTS on a random linear instance.
+
+    :param policy: "ucb" or "ts".
+    :return: Cumulative regret list.
+    """
+    features, click_probabilities = random_linear_instance(num_arms, d)
+    bandit = CascadingBandit(num_arms, click_probabilities, num_positions)
+    if policy == "ts":
+        learner = CascadeLinTS(features, num_positions)
+    else:
+        learner = CascadeLinUCB(features, num_positions)
+
+    optimal_score = optimize(click_probabilities, num_positions)
+    current_regret = 0
+    regret = []
+
+    for t in range(total_rounds):
+        selected_arms = learner.select()
+        click = bandit.recommend(selected_arms)
+        learner.update(selected_arms, click)
+
+        current_regret += optimal_score - calc_score(selected_arms, click_probabilities, num_positions)
+        regret.append(current_regret)
+
+    return regret
+
+if __name__ == "__main__":
+    T = 10000
+    for policy in ["ucb", "ts"]:
+        regret = simulate_cascade_linear(T, num_arms=1000, num_positions=4, d=10, policy=policy)
+        print(f"{policy}: final regret {regret[-1]:.2f}")
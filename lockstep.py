@@ -0,0 +1,121 @@
+import numpy as np
+import math
+import time
+from cascade_common import PRECISIONS
+
+class LockstepCascadeUCB:
+    def __init__(self, probabilities, num_positions, rng=None, precision="float64"):
+        """
+        B independent copies of the simulate_mcascade_ucb learner (problem_a.py) advanced together.
+
+        Every per-instance quantity is a row of a 2-D array, so one round for all
+        instances is a handful of NumPy calls instead of B Python loops.
+
+        :param probabilities: Array of shape (num_instances, num_arms) of click probabilities.
+        :param num_positions: Number of positions to recommend.
+        :param rng: np.random.Generator used for the clicks.
+        :param precision: "float64" keeps problem_a.py's running means, so every instance
+                          is bit-identical to its own simulate_mcascade_ucb run on the same
+                          clicks; "float32" keeps uint32 counters and computes means and UCB
+                          in float32.
+        """
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        self.num_instances, self.num_arms = self.probabilities.shape
+        assert num_positions <= self.num_arms, "Number of positions cannot exceed number of arms."
+
+        assert precision in PRECISIONS, f"precision must be one of {list(PRECISIONS)}."
+        self.num_positions = num_positions
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.precision = precision
+        self.float_dtype, count_dtype = PRECISIONS[precision]
+        # Running means (float64 only; float32 derives means from the counters)
+        self.empirical_means = np.zeros((self.num_instances, self.num_arms)) if precision == "float64" else None
+        self.click_sums = np.zeros((self.num_instances, self.num_arms), dtype=count_dtype)
+        self.counts = np.zeros((self.num_instances, self.num_arms), dtype=count_dtype)
+        self.rows = np.arange(self.num_instances)[:, None]
+        self.positions = np.arange(num_positions)
+        best = -np.sort(-self.probabilities, axis=1)[:, :num_positions]
+        self.optimal_scores = 1 - np.prod(1 - best, axis=1)
+        self.t = 1
+
+    def ucb(self):
+        """compute_ucb for every instance at once."""
+        f = self.float_dtype
+        with np.errstate(divide="ignore", invalid="ignore"):
+            counts = self.counts.astype(f, copy=False)
+            if self.precision == "float64":
+                means = self.empirical_means
+            else:
+                means = self.click_sums.astype(f, copy=False) / counts
+            values = means + np.sqrt(f(1.5 * math.log(self.t + 1)) / counts)
+        return np.where(self.counts == 0, f(np.inf), values)
+
+    def select(self):
+        """
+        Top num_positions arms of every instance, highest UCB first, shape (B, K).
+
+        Ranked like simulate_mcascade_ucb (argsort()[-K:][::-1]), so ties, e.g. between
+        unexplored arms, go to the highest index first.
+        """
+        return np.argsort(self.ucb(), axis=1)[:, -self.num_positions:][:, ::-1]
+
+    def step(self, uniforms=None, selected=None):
+        """
+        Play one round in every instance.
+
+        :param uniforms: Optional (B, K) array of click uniforms (drawn from rng if None).
+        :param selected: Optional (B, K) rankings to play instead of select()'s.
+        :return: (selected arms (B, K), clicked position per instance, per-instance regret of the round)
+        """
+        selected = self.select() if selected is None else np.asarray(selected)
+        p = self.probabilities[self.rows, selected]
+        if uniforms is None:
+            uniforms = self.rng.random(selected.shape)
+        hits = uniforms < p
+        clicks = np.where(hits.any(axis=1), hits.argmax(axis=1), self.num_positions)
+
+        # Cascade feedback: positions up to the click are examined, the click position is rewarded
+        examined = self.positions <= clicks[:, None]
+        rewarded = self.positions == clicks[:, None]
+        flat = (self.rows * self.num_arms + selected)[examined]
+        self.counts.ravel()[flat] += 1  # an arm appears at most once per ranking, so no duplicates
+        self.click_sums.ravel()[(self.rows * self.num_arms + selected)[rewarded]] += 1
+        if self.precision == "float64":
+            # problem_a.py's running-mean update, operation for operation
+            n = self.counts.ravel()[flat]
+            self.empirical_means.ravel()[flat] = (self.empirical_means.ravel()[flat] * (n - 1) + rewarded[examined]) / n
+
+        score = 1 - np.prod(1 - p, axis=1)
+        self.t += 1
+        return selected, clicks, self.optimal_scores - score
+
+def simulate_lockstep(total_rounds, num_instances, num_arms, num_positions, rng=None, record_every=1, precision="float64"):
+    """
+    Run num_instances random instances of simulate_mcascade_ucb in lockstep.
+
+    :param record_every: Keep the cumulative regret every this many rounds.
+    :return: Cumulative regret, shape (total_rounds // record_every, num_instances).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    probabilities = rng.uniform(0, 1, (num_instances, num_arms))
+    engine = LockstepCascadeUCB(probabilities, num_positions, rng, precision)
+
+    current_regret = np.zeros(num_instances)
+    regret = np.zeros((total_rounds // record_every, num_instances))
+    for t in range(1, total_rounds + 1):
+        _, _, round_regret = engine.step()
+        current_regret += round_regret
+        if t % record_every == 0:
+            regret[t // record_every - 1] = current_regret
+
+    return regret
+
+if __name__ == "__main__":
+    T = 2000
+    num_arms = 5
+    num_positions = 3
+    for B in [1, 10, 100, 1000, 10000]:
+        start = time.perf_counter()
+        regret = simulate_lockstep(T, B, num_arms, num_positions, record_every=T)
+        elapsed = time.perf_counter() - start
+        print(f"B={B}: {B * T / elapsed:,.0f} instance-rounds/s, mean final regret {regret[-1].mean():.2f}")
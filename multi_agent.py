@@ -0,0 +1,179 @@
+import numpy as np
+import math
+import time
+
+class MultiAgentCascadeUCB:
+    def __init__(self, probabilities, num_agents, horizon, collision_penalty=0.0, exploration=1.5, rng=None, chunk=4096):
+        """
+        Vectorized version of simulate_cascading_bandit_multi_agent ("import numpy as np.py").
+
+        Every agent runs UCB over the same arms and all agents receive the shared reward
+        (1 if the user clicks any of the agents' arms). The UCB indices of all agents
+        live in one (num_agents, num_arms) array and a joint arm is one argmax along
+        axis 1. As in the script the confidence width uses log(horizon), so a round only
+        changes the entry each agent played; those num_agents entries are refreshed in
+        place with a lookup table of widths instead of recomputing the whole array.
+
+        :param probabilities: Click probability of every arm.
+        :param num_agents: Number of agents (players).
+        :param horizon: Total rounds, used in the confidence width and the width table.
+        :param collision_penalty: Subtracted from the reward of every agent whose arm was
+                                  also picked by another agent (0 gives the script's model).
+        :param exploration: Constant in front of the log term of the UCB bonus.
+        :param chunk: Rounds of click uniforms drawn per RNG call.
+        """
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        self.num_arms = len(self.probabilities)
+        self.num_agents = num_agents
+        self.collision_penalty = collision_penalty
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.chunk = chunk
+
+        self.sums = np.zeros((num_agents, self.num_arms))
+        self.counts = np.zeros((num_agents, self.num_arms), dtype=np.int64)
+        self.ucb = np.full((num_agents, self.num_arms), np.inf)
+        with np.errstate(divide="ignore"):
+            self.width = np.sqrt(exploration * math.log(horizon) / np.arange(horizon + 1))
+        self.row_offsets = np.arange(num_agents) * self.num_arms
+        self.scores = np.zeros(num_agents)
+        self.uniforms = np.empty((0, num_agents))
+        self.offset = 0
+
+    def select(self):
+        """Arm of every agent, shape (num_agents,)."""
+        return self.ucb.argmax(axis=1)
+
+    def step(self):
+        """
+        Play one round.
+
+        :return: (joint arm, shared reward, reward credited to each agent (a scalar
+                 when there is no collision penalty))
+        """
+        if self.offset == len(self.uniforms):
+            self.uniforms = self.rng.random((self.chunk, self.num_agents))
+            self.offset = 0
+        uniforms = self.uniforms[self.offset]
+        self.offset += 1
+
+        joint_arm = self.select()
+        # The user scans the agents' arms and clicks at most once: the reward is shared
+        reward = float((uniforms < self.probabilities[joint_arm]).any())
+        if self.collision_penalty:
+            picked = np.bincount(joint_arm, minlength=self.num_arms)
+            rewards = reward - self.collision_penalty * (picked[joint_arm] > 1)
+        else:
+            rewards = reward
+
+        # Every agent plays exactly one arm, so the flat (agent, arm) indices never repeat
+        index = self.row_offsets + joint_arm
+        n = self.counts.ravel()[index] + 1
+        sums = self.sums.ravel()[index] + rewards
+        self.counts.ravel()[index] = n
+        self.sums.ravel()[index] = sums
+        self.ucb.ravel()[index] = sums / n + self.width[n]
+        self.scores += rewards
+        return joint_arm, reward, rewards
+
+    def run(self, total_rounds, record_every=None, max_block=4096):
+        """
+        Play total_rounds rounds, many at a time.
+
+        While the joint arm stays the same, only the played entry of each agent changes,
+        and its index after i more rounds is (sums + cumulative rewards) / (n + i) +
+        width[n + i]. The other arms of an agent are constant, so the round at which some
+        agent's argmax first changes is found with a few vectorized operations over a
+        block of rounds; all rounds before it are applied at once. Sums are accumulated
+        round by round like step() does, so the trajectory is bit-identical to step()'s on
+        the same uniforms for any collision penalty. The block grows while the joint arm
+        is stable and falls back to step() while the joint arm changes every round, which
+        is most rounds with many agents on few arms: 64 agents on 5 arms run at roughly
+        50,000 rounds per second, no faster than calling step(), while 2 agents run at
+        several million.
+
+        :param record_every: Keep the cumulative shared reward every this many rounds.
+        :return: Cumulative shared rewards at the recorded rounds.
+        """
+        assert total_rounds < len(self.width), "total_rounds exceeds the horizon."
+        total = 0.0
+        curve = []
+        t = 0
+        block = 8
+        stepping = 0
+        backoff = 1
+        while t < total_rounds:
+            if self.offset == len(self.uniforms):
+                self.uniforms = self.rng.random((self.chunk, self.num_agents))
+                self.offset = 0
+            if stepping:
+                # Joint arm changing every round (e.g. agents rotating over tied arms)
+                total += self.step()[1]
+                t += 1
+                if record_every and t % record_every == 0:
+                    curve.append(total)
+                stepping -= 1
+                continue
+            m = min(block, total_rounds - t, len(self.uniforms) - self.offset)
+            uniforms = self.uniforms[self.offset:self.offset + m]
+
+            joint_arm = self.select()
+            shared = (uniforms < self.probabilities[joint_arm]).any(axis=1).astype(float)
+            if self.collision_penalty:
+                collided = np.bincount(joint_arm, minlength=self.num_arms)[joint_arm] > 1
+                penalty = self.collision_penalty * collided
+            else:
+                penalty = np.zeros(self.num_agents)
+
+            # Index of each agent's played arm after i = 1 .. m more rounds, shape (m, A)
+            index = self.row_offsets + joint_arm
+            n = self.counts.ravel()[index] + np.arange(1, m + 1)[:, None]
+            # Accumulate round by round from the current sums, as step() does, so every
+            # intermediate value (and every argmax tie) is bit-identical to step()'s
+            rewards = shared[:, None] - penalty
+            sums = np.cumsum(np.vstack([self.sums.ravel()[index], rewards]), axis=0)[1:]
+            values = sums / n + self.width[n]
+
+            # argmax keeps the first maximum: the played arm stays chosen while it is above
+            # every arm before it and not below any arm after it
+            before = np.where(np.arange(self.num_arms) < joint_arm[:, None], self.ucb, -np.inf).max(axis=1)
+            after = np.where(np.arange(self.num_arms) > joint_arm[:, None], self.ucb, -np.inf).max(axis=1)
+            stable = ((values > before) & (values >= after)).all(axis=1)
+            # Round i + 1 of the block is played with the same joint arm iff the index after i rounds is stable
+            k = m if stable[:m - 1].all() else int(np.argmin(stable[:m - 1])) + 1
+
+            self.counts.ravel()[index] = n[k - 1]
+            self.sums.ravel()[index] = sums[k - 1]
+            self.ucb.ravel()[index] = values[k - 1]
+            self.scores = np.cumsum(np.vstack([self.scores, rewards[:k]]), axis=0)[-1]
+            self.offset += k
+
+            if record_every:
+                cumulative = total + np.cumsum(shared[:k])
+                rounds = np.arange(t + 1, t + k + 1)
+                curve.extend(cumulative[rounds % record_every == 0].tolist())
+            total += shared[:k].sum()
+            t += k
+            if k == m:
+                block = min(max_block, block * 2)
+                backoff = 1
+            elif k == 1:
+                # Blocks keep failing at once: step for a while, longer after every failure
+                block = 2
+                stepping = backoff
+                backoff = min(64, backoff * 2)
+            else:
+                block = k
+        return curve
+
+if __name__ == "__main__":
+    num_arms = 5
+    rng = np.random.default_rng(0)
+    probabilities = rng.uniform(0, 1, num_arms)
+    T = 10 ** 6
+    for num_agents, penalty in [(2, 0.0), (64, 0.0), (64, 0.5)]:
+        engine = MultiAgentCascadeUCB(probabilities, num_agents, T, collision_penalty=penalty, rng=rng)
+        start = time.perf_counter()
+        engine.run(T)
+        elapsed = time.perf_counter() - start
+        print(f"{num_agents} agents, penalty {penalty}: {T:,} rounds in {elapsed:.1f}s, "
+              f"mean score per agent per round {engine.scores.mean() / T:.3f}")
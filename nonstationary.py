@@ -0,0 +1,163 @@
+import numpy as np
+import random
+from cascade_common import CascadingBandit, compute_ucb, optimize, calc_score
+
+class DriftingCascadingBandit(CascadingBandit):
+    def __init__(self, num_arms, probabilities, num_positions, mode="drift", drift_scale=0.001, change_every=10000):
+        """
+        Cascading bandit whose click probabilities change over time.
+
+        :param mode: "drift" for a small reflected random walk every round,
+                     "piecewise" for fresh probabilities every change_every rounds.
+        :param drift_scale: Standard deviation of the per-round random walk step.
+        :param change_every: Length of each stationary segment in "piecewise" mode.
+        """
+        assert mode in ("drift", "piecewise"), "mode must be 'drift' or 'piecewise'."
+        super().__init__(num_arms, np.array(probabilities, dtype=float), num_positions)
+        self.mode = mode
+        self.drift_scale = drift_scale
+        self.change_every = change_every
+        self.t = 0
+
+    def step(self):
+        """Advance the environment by one round."""
+        self.t += 1
+        if self.mode == "drift":
+            p = self.probabilities + np.random.normal(0, self.drift_scale, self.num_arms)
+            # Reflect at the borders so the walk stays in [0, 1]
+            p = np.abs(p)
+            self.probabilities = np.where(p > 1, 2 - p, p)
+        elif self.t % self.change_every == 0:
+            self.probabilities = np.random.uniform(0, 1, self.num_arms)
+
+    def recommend(self, selected_arms):
+        click = super().recommend(selected_arms)
+        self.step()
+        return click
+
+class SlidingWindowCascadeUCB:
+    def __init__(self, num_arms, num_positions, window):
+        """
+        Cascade UCB learner that only trusts the last `window` rounds.
+
+        Each round's per-arm increments are kept in a ring buffer of length window.
+        When a round falls out of the window its increments are subtracted from the
+        running sums, so an update costs O(num_positions) whatever the window size.
+
+        :param num_arms: Total number of arms (items) available.
+        :param num_positions: Number of positions to recommend.
+        :param window: Number of most recent rounds kept in the statistics.
+        """
+        self.num_arms = num_arms
+        self.num_positions = num_positions
+        self.window = window
+        self.clicks = np.zeros(num_arms)
+        self.counts = np.zeros(num_arms)
+        # Ring buffers of the arms examined each round and which one was clicked
+        self.ring_arms = np.full((window, num_positions), -1, dtype=np.int64)
+        self.ring_clicks = np.zeros((window, num_positions))
+        self.t = 1
+
+    def select(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(self.counts > 0, self.clicks / self.counts, 0)
+        ucb_values = compute_ucb(means, self.counts, min(self.t, self.window))
+        return np.argsort(ucb_values)[-self.num_positions:][::-1]
+
+    def update(self, selected_arms, click):
+        slot = self.t % self.window
+        old_arms = self.ring_arms[slot]
+        valid = old_arms >= 0
+        np.subtract.at(self.counts, old_arms[valid], 1)
+        np.subtract.at(self.clicks, old_arms[valid], self.ring_clicks[slot][valid])
+
+        examined = np.asarray(selected_arms[:click + 1])
+        rewards = np.zeros(len(examined))
+        if click < self.num_positions:
+            rewards[click] = 1
+        self.counts[examined] += 1
+        self.clicks[examined] += rewards
+
+        self.ring_arms[slot] = -1
+        self.ring_arms[slot, :len(examined)] = examined
+        self.ring_clicks[slot] = 0
+        self.ring_clicks[slot, :len(examined)] = rewards
+        self.t += 1
+
+class DiscountedCascadeUCB:
+    def __init__(self, num_arms, num_positions, gamma):
+        """
+        Cascade UCB learner with exponentially discounted statistics.
+
+        Instead of decaying every arm each round, the discount is folded into a
+        growing weight 1 / gamma ** t applied to new observations. Sums are
+        renormalized before the weight overflows, so updates stay O(num_positions).
+
+        :param gamma: Discount factor in (0, 1).
+        """
+        self.num_arms = num_arms
+        self.num_positions = num_positions
+        self.gamma = gamma
+        self.clicks = np.zeros(num_arms)
+        self.counts = np.zeros(num_arms)
+        self.weight = 1.0
+        self.t = 1
+
+    def effective_counts(self):
+        return self.counts / self.weight
+
+    def select(self):
+        counts = self.effective_counts()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(self.counts > 0, self.clicks / self.counts, 0)
+        horizon = min(self.t, 1 / (1 - self.gamma))
+        ucb_values = compute_ucb(means, np.where(self.counts > 0, counts, 0), horizon)
+        return np.argsort(ucb_values)[-self.num_positions:][::-1]
+
+    def update(self, selected_arms, click):
+        self.weight /= self.gamma
+        for i, arm in enumerate(selected_arms[:click + 1]):
+            reward = 1 if i == click else 0
+            self.counts[arm] += self.weight
+            self.clicks[arm] += self.weight * reward
+        if self.weight > 1e100:
+            self.counts /= self.weight
+            self.clicks /= self.weight
+            self.weight = 1.0
+        self.t += 1
+
+def simulate_nonstationary(total_rounds, num_arms, num_positions, learner, mode="piecewise", **env_args):
+    """
+    Run a windowed or discounted learner on a drifting instance.
+
+    Regret is measured against the best ranking for the probabilities of each round.
+
+    :return: Cumulative regret list.
+    """
+    click_probabilities = [random.uniform(0, 1) for _ in range(num_arms)]
+    bandit = DriftingCascadingBandit(num_arms, click_probabilities, num_positions, mode=mode, **env_args)
+    current_regret = 0
+    regret = []
+
+    for t in range(total_rounds):
+        probabilities = bandit.probabilities
+        selected_arms = learner.select()
+        click = bandit.recommend(selected_arms)
+        learner.update(selected_arms, click)
+
+        current_regret += optimize(list(probabilities), num_positions) - calc_score(selected_arms, probabilities, num_positions)
+        regret.append(current_regret)
+
+    return regret
+
+if __name__ == "__main__":
+    T = 50000
+    num_arms = 10
+    num_positions = 3
+    learners = {
+        "sliding window": SlidingWindowCascadeUCB(num_arms, num_positions, window=5000),
+        "discounted": DiscountedCascadeUCB(num_arms, num_positions, gamma=0.999),
+    }
+    for name, learner in learners.items():
+        regret = simulate_nonstationary(T, num_arms, num_positions, learner, mode="piecewise", change_every=10000)
+        print(f"{name}: final regret {regret[-1]:.2f}")
@@ -0,0 +1,95 @@
+import numpy as np
+import time
+from cascade_common import CascadeUCB
+from lockstep import LockstepCascadeUCB
+
+def compare_lockstep_precisions(total_rounds, num_instances, num_arms, num_positions, seed=0):
+    """
+    Run the lockstep engine in float64 and float32 mode on the same instances
+    with the same click uniforms.
+
+    The float64 mode keeps running means and the float32 mode click/examination ratios,
+    so arms with equal ratios tie exactly only in float32; one such tie broken
+    differently sends the two runs down different feedback for good. Ranking agreement
+    is therefore measured like compare_learner_precisions: a float32 engine fed the
+    float64 engine's rankings and clicks holds the same counts, and its ranking is
+    compared with float64's every round.
+
+    :return: Dict with the share of (instance, round) pairs where float32 picks the
+             float64 ranking from the same state, the relative gap in mean final regret
+             of the independent runs, and the state bytes and mean UCB-pass time of each mode.
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = rng.uniform(0, 1, (num_instances, num_arms))
+    engines = {p: LockstepCascadeUCB(probabilities, num_positions, precision=p) for p in ("float64", "float32")}
+    shadow = LockstepCascadeUCB(probabilities, num_positions, precision="float32")
+    regret = {p: np.zeros(num_instances) for p in engines}
+    ucb_time = {p: 0.0 for p in engines}
+    same = 0
+
+    for t in range(total_rounds):
+        uniforms = rng.random((num_instances, num_positions))
+        selected = {}
+        for p, engine in engines.items():
+            start = time.perf_counter()
+            engine.ucb()
+            ucb_time[p] += time.perf_counter() - start
+            selected[p], _, round_regret = engine.step(uniforms)
+            regret[p] += round_regret
+        same += np.count_nonzero((shadow.select() == selected["float64"]).all(axis=1))
+        shadow.step(uniforms, selected["float64"])
+
+    r64, r32 = regret["float64"].mean(), regret["float32"].mean()
+    return {
+        "same_ranking": same / (total_rounds * num_instances),
+        "regret_float64": r64,
+        "regret_float32": r32,
+        "regret_rel_gap": abs(r32 - r64) / max(r64, 1e-12),
+        "state_bytes": {p: e.counts.nbytes + e.click_sums.nbytes + (e.empirical_means.nbytes if e.empirical_means is not None else 0)
+                        for p, e in engines.items()},
+        "ucb_seconds": {p: ucb_time[p] / total_rounds for p in engines},
+    }
+
+def compare_learner_precisions(total_rounds, num_arms, num_positions, seed=0):
+    """
+    Drive CascadeUCB in both precisions with the float64 learner's rankings and clicks,
+    so both always hold the same counts, and return the share of rounds where they
+    would have picked the same ranking.
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = rng.uniform(0, 1, num_arms)
+    reference = CascadeUCB(num_arms, num_positions, precision="float64")
+    compact = CascadeUCB(num_arms, num_positions, precision="float32")
+    same = 0
+    for t in range(total_rounds):
+        selected_arms = reference.select()
+        same += np.array_equal(selected_arms, compact.select())
+        hits = rng.random(num_positions) < probabilities[selected_arms]
+        click = int(hits.argmax()) if hits.any() else num_positions
+        reference.update(selected_arms, click)
+        compact.update(selected_arms, click)
+    return same / total_rounds
+
+def validate(ranking_tolerance=0.95, regret_tolerance=0.05):
+    """
+    Check that float32 mode matches float64 within tolerance on a few small configurations.
+
+    Rankings can legitimately diverge after a near-tie is broken differently, after
+    which the two runs see different feedback, so the check is statistical: most
+    rounds must agree and mean regret must be close.
+    """
+    for num_arms, num_positions in [(5, 3), (20, 4), (100, 5)]:
+        result = compare_lockstep_precisions(2000, 200, num_arms, num_positions)
+        print(f"lockstep L={num_arms} K={num_positions}: {result}")
+        assert result["same_ranking"] >= ranking_tolerance, "float32 rankings diverge too often"
+        assert result["regret_rel_gap"] <= regret_tolerance, "float32 regret differs too much"
+
+        agreement = compare_learner_precisions(5000, num_arms, num_positions)
+        print(f"CascadeUCB L={num_arms} K={num_positions}: same ranking {agreement:.4f}")
+        assert agreement >= ranking_tolerance, "float32 CascadeUCB rankings diverge too often"
+
+if __name__ == "__main__":
+    validate()
+    # Memory-bound case: a wide catalog where the UCB pass dominates
+    result = compare_lockstep_precisions(20, 64, 200000, 5)
+    print(f"large catalog: state bytes {result['state_bytes']}, UCB pass seconds {result['ucb_seconds']}")
@@ -2,6 +2,8 @@ import numpy as np
 import random
 import math
 from matplotlib import pyplot as plt
+from profiling import PhaseTimer
+from early_stop import ConvergenceController
 
 class CascadingBandit:
     def __init__(self, num_arms, probabilities, num_positions):
@@ -69,7 +71,9 @@ def calc_score(positions, click_probabilities, num_positions):
     return  prob
 
 # Example Simulation
-def simulate_cascading_bandit(total_rounds):
+def simulate_cascading_bandit(total_rounds, timer=None, controller=None):
+    if timer is None:
+        timer = PhaseTimer(enabled=False)
     num_positions = 5  # Number of items to recommend at a time
     num_players = 2
     indiv_arms = 3
@@ -102,14 +106,15 @@ def simulate_cascading_bandit(total_rounds):
         num_popped = 0
 
         # Calculate UCB Intervals
-        for p in range(num_players):
-            for arm in range(num_arms):
-                if(observations[arm] == 0):
-                    UCB[p][arm] = np.inf
-                    LCB[p][arm] = -np.inf
-                else:
-                    UCB[p][arm] = empirical_means[p][arm] + ((1.5) * np.log(total_rounds) / observations[arm]) ** (0.5)
-                    LCB[p][arm] = empirical_means[p][arm] - ((1.5) * np.log(total_rounds) / observations[arm]) ** (0.5)
+        with timer.phase("ucb_lcb"):
+            for p in range(num_players):
+                for arm in range(num_arms):
+                    if(observations[arm] == 0):
+                        UCB[p][arm] = np.inf
+                        LCB[p][arm] = -np.inf
+                    else:
+                        UCB[p][arm] = empirical_means[p][arm] + ((1.5) * np.log(total_rounds) / observations[arm]) ** (0.5)
+                        LCB[p][arm] = empirical_means[p][arm] - ((1.5) * np.log(total_rounds) / observations[arm]) ** (0.5)
 
         # print(str(UCB) + " " + str(LCB))
 
@@ -117,41 +122,45 @@ def simulate_cascading_bandit(total_rounds):
         recommendations = [desired_set[i] for i in current_order]
 
         # Check if desired_set is already right size, if not, check for disjoint arms
-        popped = False
-        for p in range(num_players):
-            if len(desired_set) > num_positions:
-                for i, rec in enumerate(recommendations):
-                    counter = 0
-                    for arm in desired_set:
-                        if UCB[p][rec] < LCB[p][arm]:
-                            counter += 1
-                    if(counter >= num_positions):
-                        # arm is disjoint, replace it in the recommendation with another arm in the desired set
-                        recommendations[i] = desired_set[(current_order[-1] + (i + 1)) % num_positions]
-                        #remove arm from desired set
-                        # print(desired_set[(current_order[0] + i) % num_arms])
-                        desired_set.pop((current_order[0] + i) % len(desired_set))
-                        num_popped += 1
-                        # print(f"New desired set {desired_set}. popped {rec}")
-                        popped = True
-                        break
-            if popped:
-                break
-            # Recommend and observe clicks
+        with timer.phase("elimination"):
+            popped = False
+            for p in range(num_players):
+                if len(desired_set) > num_positions:
+                    for i, rec in enumerate(recommendations):
+                        counter = 0
+                        for arm in desired_set:
+                            if UCB[p][rec] < LCB[p][arm]:
+                                counter += 1
+                        if(counter >= num_positions):
+                            # arm is disjoint, replace it in the recommendation with another arm in the desired set
+                            recommendations[i] = desired_set[(current_order[-1] + (i + 1)) % num_positions]
+                            #remove arm from desired set
+                            # print(desired_set[(current_order[0] + i) % num_arms])
+                            desired_set.pop((current_order[0] + i) % len(desired_set))
+                            num_popped += 1
+                            # print(f"New desired set {desired_set}. popped {rec}")
+                            popped = True
+                            break
+                if popped:
+                    break
+                # Recommend and observe clicks
             
-        click = [bandit.recommend(recommendations) for p in range(num_players)]
+        with timer.phase("recommend"):
+            click = [bandit.recommend(recommendations) for p in range(num_players)]
 
-        score = calc_score(recommendations, click_probabilities, num_positions)
+        with timer.phase("calc_score"):
+            score = calc_score(recommendations, click_probabilities, num_positions)
 
         # Update means and error terms
-        for p in range(num_players):
-            for i, arm in enumerate(recommendations[:click[p] + 1]):
-                if i == click[p]:
-                    inc = 1
-                else:
-                    inc = 0
-                empirical_means[p][arm] = (empirical_means[p][arm] * observations[arm] + inc) / (observations[arm] + 1)
-            observations[arm] += (1 / num_players)
+        with timer.phase("update"):
+            for p in range(num_players):
+                for i, arm in enumerate(recommendations[:click[p] + 1]):
+                    if i == click[p]:
+                        inc = 1
+                    else:
+                        inc = 0
+                    empirical_means[p][arm] = (empirical_means[p][arm] * observations[arm] + inc) / (observations[arm] + 1)
+                observations[arm] += (1 / num_players)
 
         # Update current_order recommendation
         if num_popped == 0:
@@ -173,6 +182,14 @@ def simulate_cascading_bandit(total_rounds):
         # print(optimal_score, score)
         regret.append(current_regret)
 
+        # Once desired_set is down to num_positions arms nothing is eliminated any more and
+        # every later round shows the same set, so the rest of the curve is a straight line
+        if controller is not None and len(desired_set) <= num_positions:
+            final_regret = optimal_score - calc_score(desired_set, click_probabilities, num_positions)
+            if controller.observe(t, tuple(sorted(desired_set)), final_regret, absorbing=True):
+                regret.extend(controller.extrapolate(current_regret, total_rounds - t - 1))
+                break
+
     # print("Length of regret: ", len(regret))
     return regret
 
@@ -180,7 +197,10 @@ def simulate_cascading_bandit(total_rounds):
     # return regret
 
 T = 1000000
-regret = simulate_cascading_bandit(T)
+timer = PhaseTimer()
+regret = simulate_cascading_bandit(T, timer, ConvergenceController())
+print(timer.summary())
+timer.write_json("problem_b_profile.json")
 plt.scatter(list(range(T)), regret)
 plt.show()
 # print("Final Regret: " + str(regret))
\ No newline at end of file
@@ -39,7 +39,7 @@ class CascadingBandit:
         isClick = False
 
         for i, arm in enumerate(selected_arms):
-            if np.random.rand() < self.probabilities[i]:  # Simulate click
+            if np.random.rand() < self.probabilities[arm]:  # Simulate click
                 click = i
                 isClick = True
                 break  # Stop after the first click (cascading model)
@@ -85,8 +85,34 @@ def convert_to_arm(num, M, L):
 def k_largest_indices(lst, k):
     return [i for _, i in heapq.nlargest(k, enumerate(lst), key = lambda x: x[1])]
 
+def etc_regret_tail(t, phase, current_order, committed_regret, click_probabilities, optimal_score, num_arms, remaining):
+    """
+    Per-round regret of the rest of a run whose committed arms no longer change.
+
+    desired_set never shrinks, so explore rounds keep cycling current_order over all
+    arms and their regret is known in advance; commit rounds repeat committed_regret
+    until t reaches a power of two.
+
+    :param t: Next round (1-based), at the start of a commit phase.
+    :return: Array of the next `remaining` per-round regrets.
+    """
+    p = np.array(click_probabilities)
+    parts = []
+    count = 0
+    while count < remaining:
+        commit = 2 ** math.ceil(math.log2(t)) - t
+        parts.append(np.full(commit, committed_regret))
+        phase += 1
+        explore = num_arms * phase
+        arms = (current_order + np.arange(1, explore + 1)[:, None]) % num_arms
+        parts.append(optimal_score - (1 - np.prod(1 - p[arms], axis=1)))
+        current_order = (current_order + explore) % num_arms
+        t += commit + explore
+        count += commit + explore
+    return np.concatenate(parts)[:remaining]
+
 # Example Simulation
-def simulate_cascading_bandit(total_rounds):
+def simulate_cascading_bandit(total_rounds, controller=None):
     explore_phase = True
     num_players = 4
     num_positions = 3
@@ -135,6 +161,7 @@ def simulate_cascading_bandit(total_rounds):
 
     phase = 1
     t = 1
+    observed = 0
     while(True):
         # Explore phase
         for j in range(num_arms * phase):
@@ -175,6 +202,17 @@ def simulate_cascading_bandit(total_rounds):
         
         score = calc_score(recommendations, click_probabilities, num_positions)
 
+        # Same committed arms for `patience` rounds: treat the policy as converged and fill
+        # in the rest of the run. Opt-in approximation: later explore phases could still
+        # change the committed arms
+        if controller is not None:
+            if controller.observe(len(regret) - 1, tuple(recommendations), optimal_score - score, rounds=len(regret) - observed):
+                remaining = T - len(regret)
+                tail = etc_regret_tail(t, phase, current_order, optimal_score - score, click_probabilities, optimal_score, num_arms, remaining)
+                regret.extend(controller.extrapolate(current_regret, remaining, tail))
+                break
+            observed = len(regret)
+
         while(math.log2(t) % 1 != 0):
             current_regret += optimal_score - score
             # print(optimal_score, "-", score, "=", current_regret)
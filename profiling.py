@@ -0,0 +1,133 @@
+import json
+import time
+import cProfile
+import pstats
+import io
+
+class _Phase:
+    """Context manager for one named phase; reused for every call to keep overhead low."""
+
+    __slots__ = ("timer", "name", "calls", "sampled", "total_ns", "countdown", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.calls = 0
+        self.sampled = 0
+        self.total_ns = 0
+        self.countdown = 0
+        self.start = 0
+
+    def __enter__(self):
+        self.calls += 1
+        if self.countdown == 0:
+            self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self.countdown == 0:
+            self.total_ns += time.perf_counter_ns() - self.start
+            self.sampled += 1
+            self.countdown = self.timer.sample_every
+        self.countdown -= 1
+        return False
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class PhaseTimer:
+    def __init__(self, sample_every=16, enabled=True):
+        """
+        Per-phase call counters and sampled wall-clock timers for simulation loops.
+
+        Every call of a phase is counted, but only one in sample_every is timed with
+        perf_counter_ns; total time is extrapolated from the sampled calls.
+
+            timer = PhaseTimer()
+            with timer.phase("ucb"):
+                ...
+            print(timer.summary())
+
+        :param sample_every: Time one call out of this many (1 times every call).
+        :param enabled: When False, phase() returns a shared no-op context manager.
+        """
+        self.sample_every = sample_every
+        self.enabled = enabled
+        self.phases = {}
+        self.started = time.perf_counter_ns()
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = _Phase(self, name)
+        return phase
+
+    def count(self, name, n=1):
+        """Count calls of a phase without timing it."""
+        if self.enabled:
+            self.phase(name).calls += n
+
+    def report(self):
+        """Dict of phase -> calls, estimated total seconds, mean microseconds per call and share of the run."""
+        wall = (time.perf_counter_ns() - self.started) / 1e9
+        rows = {}
+        for name, phase in self.phases.items():
+            mean_ns = phase.total_ns / phase.sampled if phase.sampled else 0.0
+            total = mean_ns * phase.calls / 1e9
+            rows[name] = {
+                "calls": phase.calls,
+                "sampled": phase.sampled,
+                "total_s": total,
+                "mean_us": mean_ns / 1e3,
+                "share": total / wall if wall else 0.0,
+            }
+        return {"wall_s": wall, "sample_every": self.sample_every, "phases": rows}
+
+    def summary(self):
+        """Report formatted as a table, slowest phase first."""
+        report = self.report()
+        lines = [f"{'phase':<20}{'calls':>12}{'total s':>12}{'mean us':>12}{'share':>8}"]
+        for name, row in sorted(report["phases"].items(), key=lambda item: -item[1]["total_s"]):
+            lines.append(f"{name:<20}{row['calls']:>12}{row['total_s']:>12.3f}{row['mean_us']:>12.2f}{row['share']:>8.1%}")
+        lines.append(f"wall time {report['wall_s']:.3f} s, 1 in {self.sample_every} calls timed")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+def profile_call(fn, *args, backend="cprofile", limit=25, **kwargs):
+    """
+    Run fn under a full profiler and return (result, text report).
+
+    :param backend: "cprofile" (standard library) or "pyinstrument" (must be installed).
+    :param limit: Number of cProfile rows to include.
+    """
+    if backend == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("backend='pyinstrument' needs the pyinstrument package (pip install pyinstrument).")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            profiler.stop()
+        return result, profiler.output_text()
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(fn, *args, **kwargs)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    return result, out.getvalue()
@@ -0,0 +1,234 @@
+import numpy as np
+import json
+import math
+import os
+from cascade_common import CascadeUCB
+
+# On-disk log layout: a directory with raw little-endian arrays that can be
+# appended to while logging and memory-mapped while replaying.
+RANKINGS_FILE = "rankings.bin"        # int32, (num_events, num_positions)
+CLICKS_FILE = "clicks.bin"            # int16, clicked position or num_positions
+PROPENSITIES_FILE = "propensities.bin"  # float64, probability the logger chose the ranking
+META_FILE = "meta.json"
+
+class LogWriter:
+    def __init__(self, path, num_arms, num_positions, with_propensities=False):
+        """
+        Append-only writer for logged cascade traffic.
+
+        :param path: Directory of the log (created if missing, truncated if present).
+        :param num_arms: Total number of arms (items) available.
+        :param num_positions: Number of positions in each logged ranking.
+        :param with_propensities: Whether a propensity is logged with every event.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.num_positions = num_positions
+        self.with_propensities = with_propensities
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump({"num_arms": num_arms, "num_positions": num_positions, "propensities": with_propensities}, f)
+        self.files = {name: open(os.path.join(path, name), "wb") for name in self._names()}
+
+    def _names(self):
+        names = [RANKINGS_FILE, CLICKS_FILE]
+        if self.with_propensities:
+            names.append(PROPENSITIES_FILE)
+        return names
+
+    def write(self, rankings, clicks, propensities=None):
+        """
+        Append a batch of events.
+
+        The files are read back row by row in parallel, so every batch must have one
+        click (and one propensity, when the log has them) per ranking.
+        """
+        rankings = np.asarray(rankings, dtype="<i4").reshape(-1, self.num_positions)
+        clicks = np.asarray(clicks, dtype="<i2").ravel()
+        assert len(clicks) == len(rankings), "Every ranking needs one click."
+        if self.with_propensities:
+            assert propensities is not None, "This log stores propensities; pass one per event."
+            propensities = np.asarray(propensities, dtype="<f8").ravel()
+            assert len(propensities) == len(rankings), "Every ranking needs one propensity."
+        else:
+            assert propensities is None, "This log was created without propensities."
+        self.files[RANKINGS_FILE].write(rankings.tobytes())
+        self.files[CLICKS_FILE].write(clicks.tobytes())
+        if self.with_propensities:
+            self.files[PROPENSITIES_FILE].write(propensities.tobytes())
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_history(history, path, num_arms, num_positions):
+    """Dump the (selected_arms, click) pairs of a bandit's history into a log."""
+    with LogWriter(path, num_arms, num_positions) as writer:
+        writer.write([arms for arms, _ in history], [click for _, click in history])
+
+def open_log(path):
+    """
+    Memory-map a log without reading it.
+
+    :return: (meta dict, rankings, clicks, propensities or None)
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    rankings = np.memmap(os.path.join(path, RANKINGS_FILE), dtype="<i4", mode="r").reshape(-1, meta["num_positions"])
+    clicks = np.memmap(os.path.join(path, CLICKS_FILE), dtype="<i2", mode="r")
+    propensities = None
+    if meta["propensities"]:
+        propensities = np.memmap(os.path.join(path, PROPENSITIES_FILE), dtype="<f8", mode="r")
+    return meta, rankings, clicks, propensities
+
+def iter_log_chunks(path, chunk_size=10 ** 6):
+    """Yield (rankings, clicks, propensities) chunks; only one chunk is paged in at a time."""
+    meta, rankings, clicks, propensities = open_log(path)
+    for start in range(0, len(clicks), chunk_size):
+        stop = start + chunk_size
+        yield (np.array(rankings[start:stop]), np.array(clicks[start:stop]),
+               None if propensities is None else np.array(propensities[start:stop]))
+
+def ranking_keys(rankings):
+    """
+    View each ranking as one opaque key (its int32 bytes), whatever the number of arms.
+
+    Keys sort bytewise, which is not the numeric order of the rankings but groups equal
+    rankings together, all the lookup needs.
+
+    :param rankings: Array of shape (num_events, num_positions), or one ranking.
+    :return: Array of shape (num_events,), or a single key for one ranking.
+    """
+    rankings = np.ascontiguousarray(rankings, dtype="<i4")
+    keys = rankings.view(np.dtype((np.void, rankings.itemsize * rankings.shape[-1])))
+    return keys[..., 0]
+
+class ReplayEvaluator:
+    def __init__(self, policies, num_arms, num_positions):
+        """
+        Rejection-sampling (replay) and IPS evaluation of many policies in one pass over a log.
+
+        A logged event is accepted for a policy when the policy would have shown exactly
+        the logged ranking. Accepted events are fed back to the policy through update(),
+        so learning policies are evaluated as they would have learned online. Under a
+        uniformly random logging policy the accepted click rate is unbiased; when
+        propensities are logged an IPS estimate is reported as well.
+
+        :param policies: Dict of name -> object with select() and update(selected_arms, click).
+        :param num_arms: Total number of arms (items) available.
+        :param num_positions: Number of positions in each ranking.
+        """
+        self.policies = policies
+        self.num_arms = num_arms
+        self.num_positions = num_positions
+        self.events = 0
+        self.stats = {name: {"matched": 0, "clicks": 0, "ips": 0.0} for name in policies}
+
+    def process_chunk(self, rankings, clicks, propensities=None):
+        """
+        Replay one chunk for every policy.
+
+        The chunk is sorted by ranking key once; each policy then finds its next
+        matching event with a binary search instead of scanning the chunk, so the
+        per-policy cost grows with the number of matches, not with the chunk size.
+        """
+        keys = ranking_keys(rankings)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        for name, policy in self.policies.items():
+            stats = self.stats[name]
+            position = 0  # index in the chunk of the next event the policy may match
+            while True:
+                selected_arms = policy.select()
+                key = ranking_keys(selected_arms)
+                lo = np.searchsorted(sorted_keys, key, side="left")
+                hi = np.searchsorted(sorted_keys, key, side="right")
+                # Events with this key, in log order; take the first one not yet passed
+                candidates = order[lo:hi]
+                later = candidates[np.searchsorted(candidates, position):]
+                if len(later) == 0:
+                    break
+                event = later[0]
+                click = int(clicks[event])
+                policy.update(selected_arms, click)
+                stats["matched"] += 1
+                if click < self.num_positions:
+                    stats["clicks"] += 1
+                    if propensities is not None:
+                        stats["ips"] += 1 / propensities[event]
+                position = event + 1
+
+        self.events += len(clicks)
+
+    def run(self, path, chunk_size=10 ** 6):
+        """Stream a log from disk and return the report."""
+        for rankings, clicks, propensities in iter_log_chunks(path, chunk_size):
+            self.process_chunk(rankings, clicks, propensities)
+        return self.report()
+
+    def report(self):
+        """Per-policy matched events, replay click rate and (if available) IPS click rate."""
+        result = {}
+        for name, stats in self.stats.items():
+            matched = stats["matched"]
+            result[name] = {
+                "matched": matched,
+                "replay_ctr": stats["clicks"] / matched if matched else float("nan"),
+                "ips_ctr": float(stats["ips"]) / self.events if self.events else float("nan"),
+            }
+        return result
+
+def simulate_uniform_log(path, num_events, click_probabilities, num_positions, chunk_size=10 ** 6):
+    """
+    Log traffic from a uniformly random ranking policy on a cascade instance.
+
+    :return: The optimal click rate of the instance, for reference.
+    """
+    num_arms = len(click_probabilities)
+    probabilities = np.asarray(click_probabilities)
+    propensity = 1 / math.perm(num_arms, num_positions)
+    with LogWriter(path, num_arms, num_positions, with_propensities=True) as writer:
+        for start in range(0, num_events, chunk_size):
+            n = min(chunk_size, num_events - start)
+            rankings = np.argsort(np.random.rand(n, num_arms), axis=1)[:, :num_positions]
+            hits = np.random.rand(n, num_positions) < probabilities[rankings]
+            clicks = np.where(hits.any(axis=1), hits.argmax(axis=1), num_positions)
+            writer.write(rankings, clicks, np.full(n, propensity))
+    best = np.sort(probabilities)[::-1][:num_positions]
+    return 1 - np.prod(1 - best)
+
+class FixedRanking:
+    """Non-learning policy that always shows the same ranking."""
+
+    def __init__(self, ranking):
+        self.ranking = np.asarray(ranking)
+
+    def select(self):
+        return self.ranking
+
+    def update(self, selected_arms, click):
+        pass
+
+if __name__ == "__main__":
+    import tempfile
+    num_arms = 6
+    num_positions = 2
+    click_probabilities = list(np.random.uniform(0, 1, num_arms))
+    with tempfile.TemporaryDirectory() as path:
+        optimal = simulate_uniform_log(path, 2 * 10 ** 6, click_probabilities, num_positions)
+        best = np.argsort(click_probabilities)[::-1][:num_positions]
+        policies = {
+            "ucb": CascadeUCB(num_arms, num_positions),
+            "best fixed": FixedRanking(best),
+            "worst fixed": FixedRanking(np.argsort(click_probabilities)[:num_positions]),
+        }
+        report = ReplayEvaluator(policies, num_arms, num_positions).run(path)
+        print(f"optimal click rate {optimal:.4f}")
+        for name, row in report.items():
+            print(name, row)
@@ -0,0 +1,195 @@
+import numpy as np
+import json
+import os
+import uuid
+
+def log_checkpoints(total_rounds, num_points=200):
+    """Round indices (0-based, last one included) spaced evenly on a log scale."""
+    points = np.unique(np.geomspace(1, total_rounds, num_points).astype(np.int64)) - 1
+    return points
+
+class ResultStore:
+    def __init__(self, root, num_points=200):
+        """
+        Columnar store for regret curves and run metadata.
+
+        Layout: root/algorithm=<name>/<config>/batch-<id>/ holds one .npy file per
+        metadata column (one row per run), full_regret.npy of shape (runs, T),
+        down_regret.npy at log-spaced checkpoints, and checkpoints.npy. Every file is
+        opened memory-mapped, so a query only reads the partitions and columns it needs
+        and, for "regret at round t", a single column of the full curves.
+
+        :param root: Directory of the store.
+        :param num_points: Number of log-spaced checkpoints in the downsampled curves.
+        """
+        self.root = root
+        self.num_points = num_points
+        self.buffers = {}
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def config_key(config):
+        return ",".join(f"{k}={config[k]}" for k in sorted(config))
+
+    def add_run(self, algorithm, config, regret, **metadata):
+        """
+        Buffer one run; written on flush().
+
+        :param algorithm: Name of the algorithm, e.g. "cascading_ucb", "elimination", "etc".
+        :param config: Dict of scalar parameters shared by the runs of a partition.
+        :param regret: Cumulative regret list of the run.
+        :param metadata: Extra per-run scalar columns (seed, wall time, ...). Every run of
+                         a partition must have the same columns: a missing value would
+                         turn the column into an object array, which cannot be memory-mapped.
+        """
+        assert all(value is not None and np.ndim(value) == 0 for value in metadata.values()), \
+            "Metadata values must be scalars."
+        # Grids from np.linspace / np.arange give NumPy scalars, which json cannot write
+        config = {name: value.item() if isinstance(value, np.generic) else value for name, value in config.items()}
+        key = (algorithm, self.config_key(config))
+        buffer = self.buffers.setdefault(key, {"config": config, "runs": []})
+        if buffer["runs"]:
+            expected = sorted(buffer["runs"][0][1])
+            assert sorted(metadata) == expected, \
+                f"Runs of a partition need the same metadata columns: expected {expected}, got {sorted(metadata)}."
+        buffer["runs"].append((np.asarray(regret, dtype=np.float32), metadata))
+
+    def flush(self):
+        """Write every buffered partition as a new batch."""
+        for (algorithm, key), buffer in self.buffers.items():
+            # Runs of one batch need the same length; group by length
+            by_length = {}
+            for regret, metadata in buffer["runs"]:
+                by_length.setdefault(len(regret), []).append((regret, metadata))
+            for length, runs in by_length.items():
+                self._write_batch(algorithm, key, buffer["config"], runs, length)
+        self.buffers = {}
+
+    def _write_batch(self, algorithm, key, config, runs, length):
+        partition = os.path.join(self.root, f"algorithm={algorithm}", key)
+        os.makedirs(partition, exist_ok=True)
+        with open(os.path.join(partition, "partition.json"), "w") as f:
+            json.dump({"algorithm": algorithm, "config": config}, f)
+
+        batch = os.path.join(partition, f"batch-{uuid.uuid4().hex[:12]}")
+        tmp = batch + ".tmp"
+        os.makedirs(tmp)
+        curves = np.stack([regret for regret, _ in runs])
+        checkpoints = log_checkpoints(length, self.num_points)
+        np.save(os.path.join(tmp, "full_regret.npy"), curves)
+        np.save(os.path.join(tmp, "down_regret.npy"), curves[:, checkpoints])
+        np.save(os.path.join(tmp, "checkpoints.npy"), checkpoints)
+
+        columns = {"final_regret": curves[:, -1], "total_rounds": np.full(len(runs), length)}
+        for name in sorted(runs[0][1]):
+            columns[name] = np.array([metadata[name] for _, metadata in runs])
+        for name, value in config.items():
+            columns[name] = np.full(len(runs), value)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp, f"col_{name}.npy"), values)
+        # Readers never see a half-written batch
+        os.rename(tmp, batch)
+
+    def partitions(self, algorithm=None, config=None):
+        """Yield (algorithm, config, partition path), pruned by algorithm and config values."""
+        for algo_dir in sorted(os.listdir(self.root)):
+            if not algo_dir.startswith("algorithm="):
+                continue
+            if algorithm is not None and algo_dir != f"algorithm={algorithm}":
+                continue
+            for key in sorted(os.listdir(os.path.join(self.root, algo_dir))):
+                path = os.path.join(self.root, algo_dir, key)
+                with open(os.path.join(path, "partition.json")) as f:
+                    info = json.load(f)
+                if config and any(info["config"].get(k) != v for k, v in config.items()):
+                    continue
+                yield info["algorithm"], info["config"], path
+
+    def query(self, columns=("final_regret",), algorithm=None, where=None, regret_at=None, curves=None):
+        """
+        Load selected columns of the runs that match.
+
+            store.query(["seed", "final_regret"], where={"num_players": 4})
+            store.query(["seed"], algorithm="etc", regret_at=10000)
+
+        :param columns: Metadata columns to return.
+        :param algorithm: Only this algorithm's partitions.
+        :param where: Dict of column -> value (or predicate on the column array).
+                      Keys that are partition config values prune whole partitions.
+        :param regret_at: Round (1-based) at which to read the cumulative regret; only that
+                          column of the full curves is read from disk.
+        :param curves: "down" or "full" to also return whole curves.
+        :return: Dict of column -> array, plus "algorithm", "regret_at" and "curves" when requested.
+        """
+        where = where or {}
+        config_filter = {k: v for k, v in where.items() if not callable(v)}
+        out = {name: [] for name in columns}
+        out["algorithm"] = []
+        if regret_at is not None:
+            out["regret_at"] = []
+        if curves:
+            out["curves"] = []
+
+        for algo, config, path in self.partitions(algorithm):
+            # Partition-level pruning on config values
+            if any(k in config and config[k] != v for k, v in config_filter.items()):
+                continue
+            for batch in sorted(os.listdir(path)):
+                if not batch.startswith("batch-") or batch.endswith(".tmp"):
+                    continue
+                batch_path = os.path.join(path, batch)
+                mask = None
+                for k, v in where.items():
+                    column = self._column(batch_path, k)
+                    if column is None:
+                        mask = np.zeros(0, dtype=bool)
+                        break
+                    hit = v(column) if callable(v) else column == v
+                    mask = hit if mask is None else mask & hit
+                rows = np.flatnonzero(mask) if mask is not None else None
+                n = len(rows) if rows is not None else len(self._column(batch_path, "final_regret"))
+                if n == 0:
+                    continue
+
+                for name in columns:
+                    column = self._column(batch_path, name)
+                    values = np.full(n, None) if column is None else (column[rows] if rows is not None else np.asarray(column))
+                    out[name].append(values)
+                out["algorithm"].append(np.full(n, algo))
+                if regret_at is not None:
+                    full = np.load(os.path.join(batch_path, "full_regret.npy"), mmap_mode="r")
+                    t = min(regret_at, full.shape[1]) - 1
+                    out["regret_at"].append(np.asarray(full[rows, t] if rows is not None else full[:, t]))
+                if curves:
+                    name = "full_regret.npy" if curves == "full" else "down_regret.npy"
+                    data = np.load(os.path.join(batch_path, name), mmap_mode="r")
+                    out["curves"].append(np.asarray(data[rows] if rows is not None else data))
+
+        result = {}
+        for name, parts in out.items():
+            if name == "curves":
+                result[name] = parts
+            else:
+                result[name] = np.concatenate(parts) if parts else np.array([])
+        return result
+
+    @staticmethod
+    def _column(batch_path, name):
+        path = os.path.join(batch_path, f"col_{name}.npy")
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+if __name__ == "__main__":
+    import tempfile
+    from lockstep import simulate_lockstep
+    with tempfile.TemporaryDirectory() as root:
+        store = ResultStore(root)
+        T = 5000
+        for num_arms in [5, 10]:
+            regret = simulate_lockstep(T, 20, num_arms, 3, rng=np.random.default_rng(num_arms))
+            for seed in range(regret.shape[1]):
+                store.add_run("cascading_ucb", {"num_arms": num_arms, "num_positions": 3}, regret[:, seed], seed=seed)
+        store.flush()
+        result = store.query(["seed", "num_arms"], where={"num_arms": 10}, regret_at=1000)
+        print(f"{len(result['seed'])} runs with 10 arms, mean regret at t=1000: {result['regret_at'].mean():.2f}")
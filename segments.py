@@ -0,0 +1,155 @@
+import numpy as np
+import os
+from collections import OrderedDict
+from cascade_common import PRECISIONS
+
+class SegmentStore:
+    def __init__(self, num_segments, num_arms, num_positions, capacity, spill_path=None, precision="float32", exploration=1.5):
+        """
+        Cascade UCB learners for many user segments in struct-of-arrays form.
+
+        The `capacity` most recently used segments live in contiguous (capacity, num_arms)
+        arrays of counts and clicks. Colder segments are evicted, least recently used
+        first, to memory-mapped spill arrays of shape (num_segments, num_arms) and paged
+        back in when requested. Ranking and updates for a whole batch of requests are
+        single vectorized calls regardless of how many segments exist.
+
+        :param num_segments: Total number of segments (ids 0 .. num_segments - 1).
+        :param num_arms: Total number of arms (items) available.
+        :param num_positions: Number of positions to recommend.
+        :param capacity: Number of segments kept hot in memory.
+        :param spill_path: Directory for the spill files (None keeps them as in-memory arrays).
+        :param precision: "float32" (uint32 counters) or "float64".
+        :param exploration: Constant in front of the log term of the UCB bonus.
+        """
+        self.num_segments = num_segments
+        self.num_arms = num_arms
+        self.num_positions = num_positions
+        self.capacity = min(capacity, num_segments)
+        self.exploration = exploration
+        self.float_dtype, count_dtype = PRECISIONS[precision]
+
+        self.counts = np.zeros((self.capacity, num_arms), dtype=count_dtype)
+        self.clicks = np.zeros((self.capacity, num_arms), dtype=count_dtype)
+        self.t = np.ones(self.capacity, dtype=np.int64)
+        self.slots = OrderedDict()  # segment id -> slot, least recently used first
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+        if spill_path is not None:
+            os.makedirs(spill_path, exist_ok=True)
+        self.spill_counts = self._spill(spill_path, "counts", count_dtype, (num_segments, num_arms))
+        self.spill_clicks = self._spill(spill_path, "clicks", count_dtype, (num_segments, num_arms))
+        self.spill_t = self._spill(spill_path, "t", np.int64, (num_segments,))
+        self.spill_t[:] = 1
+        self.loads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _spill(path, name, dtype, shape):
+        if path is None:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(path, name + ".bin"), dtype=dtype, mode="w+", shape=shape)
+
+    def _slots_for(self, segment_ids):
+        """Hot slot of every requested segment, paging segments in (and others out) as needed."""
+        unique = np.unique(segment_ids)
+        assert len(unique) <= self.capacity, "A batch cannot touch more segments than capacity."
+
+        missing = []
+        for s in unique.tolist():
+            if s in self.slots:
+                self.slots.move_to_end(s)
+            else:
+                missing.append(s)
+
+        if missing:
+            # Evict least recently used segments that are not part of this batch
+            need = len(missing) - len(self.free)
+            if need > 0:
+                victims = [self.slots.popitem(last=False) for _ in range(need)]
+                ids = np.array([v[0] for v in victims])
+                slots = np.array([v[1] for v in victims])
+                self.spill_counts[ids] = self.counts[slots]
+                self.spill_clicks[ids] = self.clicks[slots]
+                self.spill_t[ids] = self.t[slots]
+                self.free.extend(slots.tolist())
+                self.evictions += need
+            ids = np.array(missing)
+            slots = np.array([self.free.pop() for _ in missing])
+            self.counts[slots] = self.spill_counts[ids]
+            self.clicks[slots] = self.spill_clicks[ids]
+            self.t[slots] = self.spill_t[ids]
+            for s, slot in zip(missing, slots.tolist()):
+                self.slots[s] = slot
+            self.loads += len(missing)
+
+        lookup = np.array([self.slots[s] for s in unique.tolist()])
+        return lookup[np.searchsorted(unique, segment_ids)]
+
+    def rank(self, segment_ids):
+        """
+        Rankings for a batch of requests, one per segment id, shape (len(segment_ids), num_positions).
+        """
+        segment_ids = np.asarray(segment_ids)
+        slots = self._slots_for(segment_ids)
+        unique_slots, inverse = np.unique(slots, return_inverse=True)
+
+        f = self.float_dtype
+        counts = self.counts[unique_slots].astype(f)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = self.clicks[unique_slots].astype(f) / counts
+            bonus = np.sqrt((self.exploration * np.log(self.t[unique_slots] + 1)).astype(f)[:, None] / counts)
+        ucb = np.where(counts == 0, f(np.inf), means + bonus)
+
+        K = self.num_positions
+        top = np.argpartition(-ucb, K - 1, axis=1)[:, :K]
+        rows = np.arange(len(unique_slots))[:, None]
+        top = top[rows, np.argsort(-ucb[rows, top], axis=1, kind="stable")]
+        return top[inverse]
+
+    def update(self, segment_ids, rankings, clicks):
+        """
+        Apply cascade feedback for a batch of requests.
+
+        :param segment_ids: Segment of every request.
+        :param rankings: Rankings shown, shape (num_requests, num_positions).
+        :param clicks: Clicked position of every request, num_positions for no click.
+        """
+        segment_ids = np.asarray(segment_ids)
+        rankings = np.asarray(rankings)
+        clicks = np.asarray(clicks)
+        slots = self._slots_for(segment_ids)
+        positions = np.arange(rankings.shape[1])
+        examined = positions <= clicks[:, None]
+        rewarded = positions == clicks[:, None]
+        slot_grid = np.broadcast_to(slots[:, None], rankings.shape)
+        # Several requests of a batch can hit the same segment and arm, so accumulate with add.at
+        np.add.at(self.counts, (slot_grid[examined], rankings[examined]), 1)
+        np.add.at(self.clicks, (slot_grid[rewarded], rankings[rewarded]), 1)
+        np.add.at(self.t, slots, 1)
+
+def serve(num_segments, num_arms=50, num_positions=4, capacity=4096, batch_size=4096, num_batches=50, spill_path=None, rng=None):
+    """
+    Simulate batched traffic over Zipf-distributed segments and return requests per second.
+    """
+    import time
+    rng = rng if rng is not None else np.random.default_rng()
+    store = SegmentStore(num_segments, num_arms, num_positions, capacity, spill_path)
+    # All segments share one set of click probabilities; only their learned state differs
+    base = rng.uniform(0, 1, num_arms)
+    start = time.perf_counter()
+    for _ in range(num_batches):
+        segments = (rng.zipf(1.3, batch_size) - 1) % num_segments
+        rankings = store.rank(segments)
+        p = base[rankings]
+        hits = rng.random(rankings.shape) < p
+        clicks = np.where(hits.any(axis=1), hits.argmax(axis=1), num_positions)
+        store.update(segments, rankings, clicks)
+    return batch_size * num_batches / (time.perf_counter() - start), store
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as path:
+        for num_segments in [1000, 10000, 50000]:
+            rate, store = serve(num_segments, spill_path=os.path.join(path, str(num_segments)))
+            print(f"{num_segments} segments: {rate:,.0f} requests/s, {store.loads} loads, {store.evictions} evictions")
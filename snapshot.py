@@ -0,0 +1,207 @@
+import numpy as np
+import json
+import os
+import struct
+from multiprocessing import shared_memory
+from cascade_common import compute_ucb, convert_to_int
+from topk_joint import k_best_joint_arms
+
+# Layout of a snapshot buffer:
+#   MAGIC (8 bytes) | format version u32 | metadata length u32 | model version u64
+#   metadata JSON, padded to ALIGN
+#   arrays, each starting at a multiple of ALIGN, at the offsets listed in the metadata
+MAGIC = b"CSNAP\x00\x00\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+ALIGN = 64
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+def encode_snapshot(arrays, config, model_version=0):
+    """
+    Serialize learner state into one contiguous bytes object.
+
+    :param arrays: Dict of name -> NumPy array (counts, empirical_means, ...).
+    :param config: JSON-serializable dict (t, num_positions, exploration, joint encoding, ...).
+    :param model_version: Monotonic version number of the state.
+    """
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    meta = json.dumps({"config": config, "arrays": entries}).encode()
+    data_start = _align(HEADER.size + len(meta))
+
+    buffer = bytearray(data_start + offset)
+    HEADER.pack_into(buffer, 0, MAGIC, FORMAT_VERSION, len(meta), model_version)
+    buffer[HEADER.size:HEADER.size + len(meta)] = meta
+    for name, array in arrays.items():
+        start = data_start + entries[name]["offset"]
+        raw = np.ascontiguousarray(array).tobytes()
+        buffer[start:start + len(raw)] = raw
+    return bytes(buffer)
+
+class SnapshotView:
+    def __init__(self, buffer):
+        """
+        Read-only learner state over a snapshot buffer (bytes, mmap or shared memory).
+
+        Arrays are np.frombuffer views at their recorded offsets, so opening a snapshot
+        costs a JSON parse of the small header and nothing proportional to the state.
+        """
+        magic, fmt, meta_len, self.model_version = HEADER.unpack_from(buffer, 0)
+        assert magic == MAGIC, "Not a cascade learner snapshot."
+        assert fmt == FORMAT_VERSION, f"Unsupported snapshot format {fmt}."
+        meta = json.loads(bytes(buffer[HEADER.size:HEADER.size + meta_len]))
+        self.config = meta["config"]
+        data_start = _align(HEADER.size + meta_len)
+        self.arrays = {}
+        for name, entry in meta["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"])) if entry["shape"] else 1
+            view = np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + entry["offset"])
+            self.arrays[name] = view.reshape(entry["shape"])
+
+    def rank(self):
+        """
+        Ranking under the stored state, computed like the live learner would.
+
+        Per-arm state gives arm indices; per-player state (shape (num_players, indiv_arms))
+        gives joint arms encoded with convert_to_int.
+        """
+        config = self.config
+        means = self.arrays["empirical_means"]
+        counts = self.arrays["counts"]
+        t = config["t"]
+        exploration = config.get("exploration", 1.5)
+        K = config["num_positions"]
+        if means.ndim == 1:
+            ucb = compute_ucb(means, counts, t, means.dtype.type, exploration)
+            return np.argsort(ucb)[-K:][::-1]
+        ucb = [compute_ucb(means[p], counts[p], t, means.dtype.type, exploration) for p in range(means.shape[0])]
+        joint_arms, _ = k_best_joint_arms(ucb, K)
+        return [convert_to_int(arm, config["num_players"], config["indiv_arms"]) for arm in joint_arms]
+
+def learner_snapshot(learner, model_version=0):
+    """Encode a CascadeUCB or FactorizedCascadeUCB."""
+    config = {"t": int(learner.t), "num_positions": int(learner.num_positions),
+              "exploration": float(getattr(learner, "exploration", 1.5)),
+              "class": type(learner).__name__}
+    if hasattr(learner, "num_players"):
+        # Joint-arm encoding parameters used by convert_to_int / convert_to_arm
+        config["num_players"] = int(learner.num_players)
+        config["indiv_arms"] = int(learner.indiv_arms)
+    means = learner.empirical_means
+    if getattr(learner, "precision", "float64") != "float64":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.nan_to_num(learner.clicks.astype(learner.float_dtype) / learner.counts)
+    return encode_snapshot({"empirical_means": means, "counts": learner.counts}, config, model_version)
+
+def write_snapshot(path, data):
+    """Write a snapshot file atomically (write to a temp file, then rename)."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def open_snapshot(path):
+    """Memory-map a snapshot file and return a SnapshotView over it."""
+    return SnapshotView(np.memmap(path, dtype=np.uint8, mode="r"))
+
+# Control block: generation counter u64 | size of buffer 0 u64 | size of buffer 1 u64.
+# The writer fills buffer (generation + 1) % 2 and then increments generation, which
+# is a single aligned 8-byte store, so readers see either the old or the new buffer.
+# The publish after that rewrites the old buffer, so a reader that started at
+# generation g must check that the generation is still g after reading.
+CONTROL = struct.Struct("<QQQ")
+
+class SnapshotPublisher:
+    def __init__(self, name, capacity):
+        """
+        Single writer of a shared-memory double buffer of snapshots.
+
+        :param name: Base name of the shared memory blocks.
+        :param capacity: Maximum snapshot size in bytes.
+        """
+        self.name = name
+        self.control = shared_memory.SharedMemory(name=f"{name}_ctl", create=True, size=CONTROL.size)
+        self.buffers = [shared_memory.SharedMemory(name=f"{name}_{i}", create=True, size=capacity) for i in range(2)]
+        CONTROL.pack_into(self.control.buf, 0, 0, 0, 0)
+        self.generation = 0
+
+    def publish(self, data):
+        """Copy a snapshot into the inactive buffer and flip to it."""
+        target = (self.generation + 1) % 2
+        assert len(data) <= self.buffers[target].size, "Snapshot larger than the shared buffer."
+        self.buffers[target].buf[:len(data)] = data
+        struct.pack_into("<Q", self.control.buf, 8 + 8 * target, len(data))
+        self.generation += 1
+        struct.pack_into("<Q", self.control.buf, 0, self.generation)
+
+    def close(self):
+        for block in [self.control] + self.buffers:
+            block.close()
+            block.unlink()
+
+class SnapshotReplica:
+    def __init__(self, name):
+        """Read-only attachment to a SnapshotPublisher's double buffer."""
+        self.control = shared_memory.SharedMemory(name=f"{name}_ctl")
+        self.buffers = [shared_memory.SharedMemory(name=f"{name}_{i}") for i in range(2)]
+
+    def generation(self):
+        return struct.unpack_from("<Q", self.control.buf, 0)[0]
+
+    def current(self):
+        """
+        View of the latest published snapshot (zero copy).
+
+        Seqlock read: the generation is read before and after parsing the header, and
+        the read is retried when it changed in between. The next publish after generation
+        g + 1 rewrites the buffer of generation g while the generation still reads g + 1,
+        so a view is only safe while the generation is unchanged; call still_valid()
+        after using the view's arrays and discard what was read if it returns False.
+        """
+        while True:
+            generation = self.generation()
+            try:
+                view = SnapshotView(self.buffers[generation % 2].buf)
+            except (AssertionError, ValueError, struct.error):
+                if self.generation() == generation:
+                    raise
+                continue
+            view.generation = generation
+            if self.still_valid(view):
+                return view
+
+    def still_valid(self, view):
+        """True while no publish has completed since the view was taken."""
+        return self.generation() == view.generation
+
+    def close(self):
+        """Detach; views returned by current() must be released first."""
+        for block in [self.control] + self.buffers:
+            block.close()
+
+if __name__ == "__main__":
+    from cascade_common import CascadeUCB
+    learner = CascadeUCB(1000, 5)
+    for _ in range(200):
+        arms = learner.select()
+        learner.update(arms, np.random.randint(0, 6))
+
+    publisher = SnapshotPublisher(f"cascade_{os.getpid()}", 1 << 20)
+    try:
+        publisher.publish(learner_snapshot(learner, model_version=1))
+        replica = SnapshotReplica(publisher.name)
+        view = replica.current()
+        print(f"replica at version {view.model_version} ranks {list(view.rank())}, live learner ranks {list(learner.select())}")
+        del view
+        replica.close()
+    finally:
+        publisher.close()
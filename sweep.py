@@ -0,0 +1,143 @@
+import numpy as np
+import copy
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from cascade_common import CascadeUCB, optimize
+from tapes import ClickTape
+
+def click_uniforms(seed, num_arms, total_rounds, tape=None):
+    """
+    Yield one row of per-arm click uniforms per round from a seeded stream.
+
+    Uniforms are indexed by arm, not by position, so every policy run on the same
+    instance faces the same users (common random numbers). The rows are those of the
+    ClickTape of the same seed, generated on the fly; pass a stored tape to read them
+    instead of drawing.
+    """
+    if tape is not None:
+        yield from tape.cursor().rows(total_rounds)
+        return
+    for chunk in ClickTape.generate(seed, num_arms, total_rounds):
+        yield from chunk
+
+def instance_probabilities(indiv_arms, num_players, seed):
+    """Click probabilities of the joint-arm instance, as in problem_b.py, from a fixed seed."""
+    return np.random.default_rng([seed, 0]).uniform(0, 1, indiv_arms ** num_players)
+
+def _play(learner, probabilities, uniforms, rounds, optimal_score, record_every, regret, current_regret):
+    num_positions = learner.num_positions
+    for _ in range(rounds):
+        selected_arms = learner.select()
+        p = probabilities[selected_arms]
+        hits = next(uniforms)[selected_arms] < p
+        click = int(hits.argmax()) if hits.any() else num_positions
+        learner.update(selected_arms, click)
+        current_regret += optimal_score - (1 - np.prod(1 - p))
+        if (learner.t - 1) % record_every == 0:
+            regret.append(current_regret)
+    return current_regret
+
+def run_group(task):
+    """
+    Run every exploration constant of one (instance, num_positions) group.
+
+    While at least num_positions arms are unexplored, UCB ranks only unexplored
+    (infinite-index) arms, so that warm-up does not depend on the exploration
+    constant. It is played once and the learner state is copied for each constant.
+    """
+    indiv_arms, num_players, seed, num_positions, explorations, total_rounds, optimal_score, record_every = task
+    probabilities = instance_probabilities(indiv_arms, num_players, seed)
+    num_arms = len(probabilities)
+
+    warm = CascadeUCB(num_arms, num_positions)
+    uniforms = click_uniforms(seed, num_arms, total_rounds)
+    warm_regret = []
+    warm_total = 0.0
+    warm_rounds = 0
+    while warm_rounds < total_rounds and np.count_nonzero(warm.counts == 0) >= num_positions:
+        warm_total = _play(warm, probabilities, uniforms, 1, optimal_score, record_every, warm_regret, warm_total)
+        warm_rounds += 1
+
+    results = []
+    for exploration in explorations:
+        learner = copy.deepcopy(warm)
+        learner.exploration = exploration
+        learner.ucb_values = None
+        # Resume the shared random stream right after the warm-up rounds
+        rest = click_uniforms(seed, num_arms, total_rounds)
+        for _ in range(warm_rounds):
+            next(rest)
+        regret = list(warm_regret)
+        final = _play(learner, probabilities, rest, total_rounds - warm_rounds, optimal_score, record_every, regret, warm_total)
+        results.append({
+            "indiv_arms": indiv_arms,
+            "num_players": num_players,
+            "seed": seed,
+            "num_positions": num_positions,
+            "exploration": exploration,
+            "warmup_rounds": warm_rounds,
+            "final_regret": final,
+            "regret": np.array(regret),
+        })
+    return results
+
+class ParameterSweep:
+    def __init__(self, total_rounds, num_positions, indiv_arms, num_players, explorations=(1.5,), seeds=(0,), record_every=100):
+        """
+        Grid sweep of cascade UCB sharing instances, click randomness and optimal scores.
+
+        Points with the same (indiv_arms, num_players, seed) run on the same instance and
+        the same click uniforms; the optimal score is computed once per (instance,
+        num_positions); duplicate grid values are dropped; exploration constants of a
+        group share their warm-up.
+
+        :param total_rounds: Rounds per run.
+        :param num_positions, indiv_arms, num_players, explorations, seeds: Values to sweep.
+        :param record_every: Keep the cumulative regret every this many rounds.
+        """
+        self.total_rounds = total_rounds
+        self.record_every = record_every
+        self.explorations = sorted(set(explorations))
+        self.tasks = []
+        optimal_scores = {}
+        for indiv, players, seed, K in itertools.product(sorted(set(indiv_arms)), sorted(set(num_players)), sorted(set(seeds)), sorted(set(num_positions))):
+            if K > indiv ** players:
+                continue
+            key = (indiv, players, seed, K)
+            if key not in optimal_scores:
+                optimal_scores[key] = optimize(list(instance_probabilities(indiv, players, seed)), K)
+            self.tasks.append((indiv, players, seed, K, self.explorations, total_rounds, optimal_scores[key], record_every))
+        # Largest catalogs first so the pool does not finish on one long straggler
+        self.tasks.sort(key=lambda task: -(task[0] ** task[1]) * len(task[4]))
+
+    def run(self, max_workers=None):
+        """
+        Run the sweep on a process pool; idle workers take the next task from the shared
+        queue, so uneven tasks balance themselves.
+
+        :return: List of result dicts, one per (instance, num_positions, exploration).
+        """
+        if max_workers == 1:
+            return [row for task in self.tasks for row in run_group(task)]
+        results = []
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            futures = [pool.submit(run_group, task) for task in self.tasks]
+            for future in as_completed(futures):
+                results.extend(future.result())
+        return results
+
+if __name__ == "__main__":
+    sweep = ParameterSweep(
+        total_rounds=20000,
+        num_positions=[2, 3, 5],
+        indiv_arms=[3, 4],
+        num_players=[2],
+        explorations=[0.5, 1.0, 1.5, 2.0],
+        seeds=range(4),
+    )
+    results = sweep.run()
+    for K in [2, 3, 5]:
+        for c in sweep.explorations:
+            rows = [r["final_regret"] for r in results if r["num_positions"] == K and r["exploration"] == c]
+            print(f"K={K} c={c}: mean final regret {np.mean(rows):.2f} over {len(rows)} runs")
@@ -0,0 +1,179 @@
+import numpy as np
+import json
+import os
+
+# Rows of click uniforms generated at a time; every reader of a seed (tapes on disk,
+# sweep.click_uniforms) uses the same chunking, so the same seed gives the same uniforms.
+TAPE_CHUNK = 4096
+
+class ClickTape:
+    def __init__(self, uniforms, seed=None):
+        """
+        Pre-generated click uniforms, one row per user (round) and one column per arm.
+
+        An arm is attractive to user t when uniforms[t, arm] < p[arm]. Because columns
+        are arms, not positions, two policies replaying the same tape face the same
+        users whatever they rank (common random numbers), and the simulation loop does
+        no RNG calls.
+
+        :param uniforms: Array (or memmap) of shape (total_rounds, num_arms).
+        :param seed: Seed the tape was generated from, for reference.
+        """
+        self.uniforms = uniforms
+        self.total_rounds, self.num_arms = uniforms.shape
+        self.seed = seed
+
+    @classmethod
+    def create(cls, total_rounds, num_arms, seed, path=None, dtype=np.float64):
+        """
+        Generate a tape, memory-mapped under path if given (kept in RAM otherwise).
+
+        float32 halves the size; uniforms are then rounded to 2^-24, which is far below
+        any click probability resolution the simulators use.
+        """
+        shape = (total_rounds, num_arms)
+        if path is None:
+            uniforms = np.empty(shape, dtype=dtype)
+        else:
+            os.makedirs(path, exist_ok=True)
+            uniforms = np.memmap(os.path.join(path, "uniforms.bin"), dtype=dtype, mode="w+", shape=shape)
+        start = 0
+        for chunk in cls.generate(seed, num_arms, total_rounds):
+            uniforms[start:start + len(chunk)] = chunk
+            start += len(chunk)
+        if path is not None:
+            uniforms.flush()
+            with open(os.path.join(path, "meta.json"), "w") as f:
+                json.dump({"total_rounds": total_rounds, "num_arms": num_arms, "seed": seed, "dtype": np.dtype(dtype).str}, f)
+        return cls(uniforms, seed)
+
+    @staticmethod
+    def generate(seed, num_arms, total_rounds):
+        """Yield the tape of seed in chunks of TAPE_CHUNK rows, without storing it."""
+        rng = np.random.default_rng([seed, 1])
+        for start in range(0, total_rounds, TAPE_CHUNK):
+            yield rng.random((min(TAPE_CHUNK, total_rounds - start), num_arms))
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map an existing tape read-only."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        uniforms = np.memmap(os.path.join(path, "uniforms.bin"), dtype=np.dtype(meta["dtype"]), mode="r",
+                             shape=(meta["total_rounds"], meta["num_arms"]))
+        return cls(uniforms, meta["seed"])
+
+    def cursor(self):
+        """Independent reader starting at round 0; give one to every environment."""
+        return TapeCursor(self)
+
+class TapeCursor:
+    def __init__(self, tape):
+        self.tape = tape
+        self.position = 0
+
+    def rows(self, n):
+        """The next n rows, shape (n, num_arms)."""
+        assert self.position + n <= self.tape.total_rounds, "Click tape exhausted."
+        rows = self.tape.uniforms[self.position:self.position + n]
+        self.position += n
+        return rows
+
+    def __next__(self):
+        return self.rows(1)[0]
+
+    def __iter__(self):
+        return self
+
+def attach_tape(bandit, tape, calls_per_round=1):
+    """
+    Make an environment object draw its clicks from a tape.
+
+    Works with any environment that has probabilities, num_positions and history and
+    a cascade recommend(selected_arms) (the CascadingBandit classes of the scripts and
+    cascade_common, cascading.py's MultiplayerCascadingBandit with (arm1, arm2) tuples).
+    Row t of the tape is the user of round t: the recommend() calls of one round read
+    the same row, so a simulator that asks once per player (problem_b.py, with
+    calls_per_round=num_players) shows all players the same user.
+
+    :param calls_per_round: Number of recommend() calls the simulator makes per round.
+    """
+    cursor = tape.cursor()
+    shape = np.shape(bandit.probabilities)
+    calls = 0
+    row = None
+
+    def recommend(selected_arms):
+        nonlocal calls, row
+        if calls % calls_per_round == 0:
+            row = next(cursor)
+        calls += 1
+        click = bandit.num_positions
+        for i, arm in enumerate(selected_arms):
+            index = np.ravel_multi_index(tuple(arm), shape) if isinstance(arm, tuple) else arm
+            p = bandit.probabilities
+            for a in (arm if isinstance(arm, tuple) else (arm,)):
+                p = p[a]
+            if row[index] < p:
+                click = i
+                break
+        bandit.history.append((selected_arms, click))
+        return click
+
+    bandit.recommend = recommend
+    bandit.tape_cursor = cursor
+    return bandit
+
+def taped(bandit_class, tape, calls_per_round=1):
+    """Subclass of bandit_class whose instances draw clicks from tape (for classes built inside a simulator)."""
+    class Taped(bandit_class):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            attach_tape(self, tape, calls_per_round)
+    return Taped
+
+if __name__ == "__main__":
+    import random
+    from cascade_common import CascadeUCB, CascadingBandit
+
+    # problem_b.py's 9 joint arms on a fixed instance (seed 0), 2 positions so that a
+    # round can end without a click. Pseudo-regret is computed from the probabilities,
+    # so the tape only enters through the clicks: compare the clicks the policies
+    # collect, with each pair facing the same users or independent ones.
+    T = 10000
+    num_arms, num_positions = 9, 2
+
+    def environment(tape):
+        random.seed(0)
+        probabilities = sorted((random.uniform(0, 1) for _ in range(num_arms)), reverse=True)
+        return attach_tape(CascadingBandit(num_arms, probabilities, num_positions), tape)
+
+    def ucb_clicks(tape, exploration):
+        bandit = environment(tape)
+        learner = CascadeUCB(num_arms, num_positions, exploration=exploration)
+        clicks = 0
+        for t in range(T):
+            selected_arms = learner.select()
+            click = bandit.recommend(selected_arms)
+            learner.update(selected_arms, click)
+            clicks += click < num_positions
+        return clicks
+
+    def best_fixed_clicks(tape):
+        bandit = environment(tape)
+        return sum(bandit.recommend(list(range(num_positions))) < num_positions for t in range(T))
+
+    pairs = {
+        "best fixed - UCB 1.5": (best_fixed_clicks, lambda tape: ucb_clicks(tape, 1.5)),
+        "UCB 1.5 - UCB 0.5": (lambda tape: ucb_clicks(tape, 1.5), lambda tape: ucb_clicks(tape, 0.5)),
+    }
+    for name, (first, second) in pairs.items():
+        shared, independent = [], []
+        for seed in range(20):
+            tape = ClickTape.create(T, num_arms, seed)
+            other = ClickTape.create(T, num_arms, seed + 1000)
+            a = first(tape)
+            shared.append(a - second(tape))
+            independent.append(a - second(other))
+        print(f"clicks, {name}: mean gap {np.mean(shared):.1f}, std of the gap {np.std(shared, ddof=1):.1f} "
+              f"with a shared tape vs {np.std(independent, ddof=1):.1f} with independent tapes")
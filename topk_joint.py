@@ -0,0 +1,63 @@
+import numpy as np
+import heapq
+
+def k_best_joint_arms(player_scores, k):
+    """
+    Top-k joint arms when a joint arm's score is the sum of its players' scores.
+
+    Works like k-best sums of sorted arrays: each player's scores are sorted once,
+    then joint arms are popped from a priority queue in decreasing order of score.
+    Every popped rank tuple only pushes the tuples that increment a coordinate at or
+    after its last non-zero one, so each tuple is generated exactly once and the
+    product space is never enumerated.
+
+    :param player_scores: List of 1-D score arrays, one per player (lengths may differ).
+    :param k: Number of joint arms to return.
+    :return: (int array of shape (k, num_players) with the joint arms, array of their summed scores)
+    """
+    num_players = len(player_scores)
+    sizes = [len(s) for s in player_scores]
+    k = min(k, int(np.prod(sizes)))
+
+    orders = [np.argsort(-np.asarray(s), kind="stable") for s in player_scores]
+    sorted_scores = [np.asarray(s)[order] for s, order in zip(player_scores, orders)]
+
+    def total(ranks):
+        return sum(sorted_scores[p][r] for p, r in enumerate(ranks))
+
+    start = (0,) * num_players
+    counter = 0  # tie-breaker so the heap never compares tuples of ranks by value
+    heap = [(-total(start), counter, start, 0)]
+    arms = []
+    scores = []
+
+    while len(arms) < k:
+        neg_score, _, ranks, first = heapq.heappop(heap)
+        arms.append([orders[p][r] for p, r in enumerate(ranks)])
+        scores.append(-neg_score)
+
+        for p in range(first, num_players):
+            if ranks[p] + 1 < sizes[p]:
+                child = ranks[:p] + (ranks[p] + 1,) + ranks[p + 1:]
+                counter += 1
+                heapq.heappush(heap, (-total(child), counter, child, p))
+
+    return np.array(arms, dtype=np.int64).reshape(k, num_players), np.array(scores)
+
+def k_best_near_separable(player_scores, k, exact_score, oversample=4):
+    """
+    Top-k joint arms for scores that are only approximately separable.
+
+    The separable sum is used to enumerate k * oversample candidates, which are then
+    re-ranked with exact_score. Exact whenever the true top-k are among those candidates.
+
+    :param player_scores: List of 1-D score arrays, one per player.
+    :param k: Number of joint arms to return.
+    :param exact_score: Function mapping a (n, num_players) array of joint arms to n scores.
+    :param oversample: How many candidates to enumerate per returned joint arm.
+    :return: (joint arms of shape (k, num_players), their exact scores)
+    """
+    candidates, _ = k_best_joint_arms(player_scores, k * oversample)
+    exact = np.asarray(exact_score(candidates))
+    order = np.argsort(-exact, kind="stable")[:k]
+    return candidates[order], exact[order]
@@ -0,0 +1,180 @@
+import asyncio
+import numpy as np
+import random
+import time
+from cascade_common import CascadingBandit, CascadeUCB, optimize, calc_score, random_probabilities
+from tapes import ClickTape, attach_tape
+
+async def poisson_arrivals(rate, num_users, rng=None):
+    """
+    Yield arrival times (seconds since start) of a Poisson process.
+
+    :param rate: Mean arrivals per second.
+    :param num_users: Number of arrivals to generate.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    t = 0.0
+    for _ in range(num_users):
+        t += rng.exponential(1 / rate)
+        yield t
+
+async def trace_arrivals(timestamps, speedup=1.0):
+    """Replay recorded arrival timestamps (seconds), optionally compressed by speedup."""
+    start = timestamps[0] if len(timestamps) else 0.0
+    for ts in timestamps:
+        yield (ts - start) / speedup
+
+def bursty_trace(num_users, base_rate, burst_rate, burst_every, burst_length, rng=None):
+    """Arrival timestamps alternating between a base Poisson rate and short bursts."""
+    rng = rng if rng is not None else np.random.default_rng()
+    timestamps = []
+    t = 0.0
+    while len(timestamps) < num_users:
+        in_burst = (t % burst_every) < burst_length
+        t += rng.exponential(1 / (burst_rate if in_burst else base_rate))
+        timestamps.append(t)
+    return timestamps
+
+class TrafficGenerator:
+    def __init__(self, bandit, learner, feedback_delay=0.0, update_batch=1):
+        """
+        Asyncio load test of a cascade learner behind a CascadingBandit environment.
+
+        Users arrive according to an arrival process and wait in a queue for a ranking
+        from learner.select(). Their click is drawn right away but only delivered to
+        learner.update() after feedback_delay, and deliveries are applied in batches of
+        update_batch.
+
+        :param bandit: Environment with recommend(selected_arms) -> click.
+        :param learner: Object with select() and update(selected_arms, click).
+        :param feedback_delay: Seconds until a click is delivered, or a function returning one per user.
+        :param update_batch: Number of delivered feedback events applied together.
+        """
+        self.bandit = bandit
+        self.learner = learner
+        self.feedback_delay = feedback_delay if callable(feedback_delay) else (lambda: feedback_delay)
+        self.update_batch = update_batch
+        self.optimal_score = optimize(list(bandit.probabilities), bandit.num_positions)
+        self.reset()
+
+    def reset(self):
+        self.latencies = []
+        self.pending = []
+        self.regret = 0.0
+        self.served = 0
+        self.applied = 0
+
+    def _deliver(self, selected_arms, click):
+        self.pending.append((selected_arms, click))
+        if len(self.pending) >= self.update_batch:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        if hasattr(self.learner, "update_batch"):
+            self.learner.update_batch([arms for arms, _ in self.pending], [click for _, click in self.pending])
+        else:
+            for selected_arms, click in self.pending:
+                self.learner.update(selected_arms, click)
+        self.applied += len(self.pending)
+        self.pending = []
+
+    async def _arrive(self, arrivals, queue, start):
+        async for arrival in arrivals:
+            wait = start + arrival - time.perf_counter()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await queue.put(start + arrival)
+        await queue.put(None)
+
+    async def _serve(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            arrived = await queue.get()
+            if arrived is None:
+                break
+            selected_arms = self.learner.select()
+            self.latencies.append(time.perf_counter() - arrived)
+            click = self.bandit.recommend(selected_arms)
+            self.regret += self.optimal_score - calc_score(selected_arms, self.bandit.probabilities, self.bandit.num_positions)
+            self.served += 1
+            delay = self.feedback_delay()
+            if delay > 0:
+                loop.call_later(delay, self._deliver, selected_arms, click)
+            else:
+                self._deliver(selected_arms, click)
+            # Let arrivals and feedback callbacks run between users
+            await asyncio.sleep(0)
+
+    async def run(self, arrivals, max_delay=None):
+        """
+        Drive the learner with an arrival process and return the report.
+
+        :param arrivals: Async iterator of arrival times, e.g. poisson_arrivals(...).
+        :param max_delay: Upper bound on feedback delays to wait for before the final flush.
+        """
+        self.reset()
+        queue = asyncio.Queue()
+        start = time.perf_counter()
+        await asyncio.gather(self._arrive(arrivals, queue, start), self._serve(queue))
+        elapsed = time.perf_counter() - start
+        if max_delay:
+            await asyncio.sleep(max_delay)
+        self._flush()
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        latencies = np.array(self.latencies) * 1e3
+        return {
+            "users": self.served,
+            "throughput": self.served / elapsed if elapsed else float("nan"),
+            "latency_ms": {q: float(np.percentile(latencies, q)) if len(latencies) else float("nan") for q in (50, 95, 99)},
+            "regret": self.regret,
+            "feedback_applied": self.applied,
+        }
+
+def immediate_regret(click_probabilities, num_positions, num_users, learner, tape=None):
+    """
+    Regret of the same number of users with every click applied right away, for comparison.
+
+    :param tape: Optional tapes.ClickTape of the users; pass the load test's tape so both
+                 runs face the same users.
+    """
+    bandit = CascadingBandit(len(click_probabilities), click_probabilities, num_positions)
+    if tape is not None:
+        attach_tape(bandit, tape)
+    optimal_score = optimize(click_probabilities, num_positions)
+    regret = 0.0
+    for _ in range(num_users):
+        selected_arms = learner.select()
+        click = bandit.recommend(selected_arms)
+        learner.update(selected_arms, click)
+        regret += optimal_score - calc_score(selected_arms, click_probabilities, num_positions)
+    return regret
+
+def run_load_test(num_arms=20, num_positions=4, rate=2000.0, num_users=5000, feedback_delay=0.05, update_batch=1, seed=None):
+    """
+    Poisson load test of CascadeUCB with the regret cost of delayed, batched feedback.
+
+    The load test and the immediate-feedback run read their clicks from the same click
+    tape (common random numbers), so delay_regret_cost is the cost of the delay, not the
+    difference between two independent click streams; it is exactly 0 without delay.
+
+    :param seed: Seed of the click tape (random if None).
+    """
+    click_probabilities = random_probabilities(num_arms)
+    seed = seed if seed is not None else random.getrandbits(32)
+    tape = ClickTape.create(num_users, num_arms, seed)
+    bandit = attach_tape(CascadingBandit(num_arms, click_probabilities, num_positions), tape)
+    generator = TrafficGenerator(bandit, CascadeUCB(num_arms, num_positions), feedback_delay, update_batch)
+    max_delay = feedback_delay if not callable(feedback_delay) else None
+    report = asyncio.run(generator.run(poisson_arrivals(rate, num_users), max_delay))
+    report["immediate_regret"] = immediate_regret(click_probabilities, num_positions, num_users, CascadeUCB(num_arms, num_positions), tape)
+    report["delay_regret_cost"] = report["regret"] - report["immediate_regret"]
+    return report
+
+if __name__ == "__main__":
+    for delay, batch in [(0.0, 1), (0.05, 1), (0.2, 100)]:
+        report = run_load_test(feedback_delay=delay, update_batch=batch)
+        print(f"delay={delay}s batch={batch}: {report}")
@@ -0,0 +1,137 @@
+import numpy as np
+import heapq
+import math
+from cascade_common import convert_to_arm
+
+class TreeCascadeUCB:
+    def __init__(self, num_arms, num_positions, branching, horizon, smoothness=1.0, decay=0.5, exploration=1.5):
+        """
+        Cascade UCB over a b-ary tree of arms with HOO-style optimistic search.
+
+        Arm i is leaf i of a complete tree of the given branching factor, so for joint
+        arms with branching = L and num_arms = L^M the subtree of a node is exactly the
+        joint arms sharing a player prefix in the convert_to_int ordering. Every node
+        keeps the clicks and examinations of the leaves below it and an optimistic value
+
+            U = mean + sqrt(exploration * log(horizon) / n) + smoothness * decay^depth
+            B = min(U, max B of the children)
+
+        (U is infinite until the node is examined; leaves have no smoothness term).
+        Using log(horizon), as in problem_b.py, means a round only changes the values on
+        the paths of the examined leaves, so update() costs O(K * depth * branching) and
+        select() is a best-first descent that expands about K paths instead of scanning
+        every arm.
+
+        :param num_arms: Number of arms (leaves); padded up to a power of branching.
+        :param num_positions: Number of positions to recommend.
+        :param branching: Children per node.
+        :param horizon: Total rounds, used in the confidence width.
+        :param smoothness: Bound on how far a leaf's click probability can be from its
+                           parent's mean at depth 0 (1.0 assumes nothing).
+        :param decay: Factor by which that bound shrinks per level.
+        """
+        self.num_arms = num_arms
+        self.num_positions = num_positions
+        self.branching = branching
+        self.depth = max(1, math.ceil(round(math.log(num_arms, branching), 9)))
+        self.log_term = exploration * math.log(horizon)
+        self.spread = [smoothness * decay ** h for h in range(self.depth)] + [0.0]
+
+        sizes = [branching ** h for h in range(self.depth + 1)]
+        self.counts = [np.zeros(n) for n in sizes]
+        self.clicks = [np.zeros(n) for n in sizes]
+        self.B = [np.full(n, np.inf) for n in sizes]
+        # Padding leaves can never be selected
+        self.B[-1][num_arms:] = -np.inf
+        for h in range(self.depth - 1, -1, -1):
+            self.B[h] = self.B[h + 1].reshape(-1, branching).max(axis=1)
+        self.expanded = 0
+
+    @classmethod
+    def for_joint_arms(cls, indiv_arms, num_players, num_positions, horizon, **kwargs):
+        """Tree whose levels are the players of the joint arm, as in problem_c.py."""
+        return cls(indiv_arms ** num_players, num_positions, indiv_arms, horizon, **kwargs)
+
+    def select(self):
+        """Top num_positions leaves by B, best first."""
+        b = self.branching
+        heap = [(-self.B[0][0], 0, 0)]
+        selected = []
+        while heap and len(selected) < self.num_positions:
+            neg_b, neg_h, node = heapq.heappop(heap)
+            h = -neg_h
+            if h == self.depth:
+                selected.append(node)
+                continue
+            self.expanded += 1
+            children = np.arange(node * b, node * b + b)
+            values = self.B[h + 1][children]
+            for child, value in zip(children.tolist(), values.tolist()):
+                if value > -np.inf:
+                    # Deeper nodes win ties so equal (e.g. unexplored) subtrees are finished first
+                    heapq.heappush(heap, (-value, -(h + 1), child))
+        return np.array(selected)
+
+    def select_joint(self, num_players):
+        """select() as lists of per-player arms (convert_to_arm of each leaf)."""
+        return [convert_to_arm(int(leaf), num_players, self.branching) for leaf in self.select()]
+
+    def update(self, selected_arms, click):
+        selected_arms = np.asarray(selected_arms)
+        examined = selected_arms[:click + 1]
+        rewards = (np.arange(len(examined)) == click).astype(float)
+        nodes = examined
+        for h in range(self.depth, -1, -1):
+            np.add.at(self.counts[h], nodes, 1)
+            np.add.at(self.clicks[h], nodes, rewards)
+            nodes = nodes // self.branching
+
+        # Refresh B bottom-up along the touched paths only
+        nodes = np.unique(examined)
+        for h in range(self.depth, -1, -1):
+            n = self.counts[h][nodes]
+            u = np.where(n > 0, self.clicks[h][nodes] / np.maximum(n, 1) + np.sqrt(self.log_term / np.maximum(n, 1)) + self.spread[h], np.inf)
+            if h < self.depth:
+                children = nodes[:, None] * self.branching + np.arange(self.branching)
+                u = np.minimum(u, self.B[h + 1][children].max(axis=1))
+            self.B[h][nodes] = u
+            nodes = np.unique(nodes // self.branching)
+
+def simulate_tree_ucb(total_rounds, indiv_arms, num_players, num_positions, rng=None, **kwargs):
+    """
+    TreeCascadeUCB on a random joint-arm instance drawn like problem_c.py's.
+
+    :return: (cumulative regret list, learner).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    probabilities = rng.uniform(0, 1, indiv_arms ** num_players)
+    optimal_score = 1 - np.prod(1 - np.sort(probabilities)[-num_positions:])
+    learner = TreeCascadeUCB.for_joint_arms(indiv_arms, num_players, num_positions, total_rounds, **kwargs)
+    current_regret = 0
+    regret = []
+    for t in range(total_rounds):
+        selected_arms = learner.select()
+        p = probabilities[selected_arms]
+        hits = rng.random(num_positions) < p
+        click = int(hits.argmax()) if hits.any() else num_positions
+        learner.update(selected_arms, click)
+        current_regret += optimal_score - (1 - np.prod(1 - p))
+        regret.append(current_regret)
+    return regret, learner
+
+if __name__ == "__main__":
+    import time
+    from cascade_common import CascadeUCB
+    T = 5000
+    # The 8-player, 5-arm joint space of cascadingMulti.py: 390,625 joint arms
+    indiv_arms, num_players, num_positions = 5, 8, 3
+    start = time.perf_counter()
+    regret, learner = simulate_tree_ucb(T, indiv_arms, num_players, num_positions, np.random.default_rng(0))
+    elapsed = time.perf_counter() - start
+    print(f"tree: {elapsed / T * 1e6:.0f} us per round, {learner.expanded / T:.1f} nodes expanded per round, regret {regret[-1]:.1f}")
+
+    dense = CascadeUCB(indiv_arms ** num_players, num_positions)
+    start = time.perf_counter()
+    for _ in range(100):
+        dense.update(dense.select(), num_positions)
+    print(f"flat CascadeUCB: {(time.perf_counter() - start) / 100 * 1e6:.0f} us per round")